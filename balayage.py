@@ -0,0 +1,145 @@
+import csv
+import itertools
+import multiprocessing
+import time
+import numpy as np
+import utils
+from ressim import EquationChaleur
+
+# paramètres de `EquationChaleur` fixés par `resoudre_cas` (chaque cas est résolu sans historique ni affichage)
+RESERVES = {'differe'}
+
+
+def combinaisons(grille):
+    """
+    Développe une grille de paramètres en la liste de tous les cas à simuler.
+
+    Arguments:
+        grille (dict ou list[dict]): Pour chaque paramètre de `EquationChaleur`, la liste des valeurs à essayer
+                                     (produit cartésien). Une liste de grilles est développée grille par grille.
+
+    Retourne:
+        list[dict]: Les paramètres de chaque cas.
+    """
+    if isinstance(grille, dict):
+        grille = [grille]
+    cas = []
+    for sous_grille in grille:
+        noms = list(sous_grille)
+        for valeurs in itertools.product(*(sous_grille[nom] for nom in noms)):
+            cas.append(dict(zip(noms, valeurs)))
+    return cas
+
+
+def resoudre_cas(parametres, sondes=(), tolerance=1e-3):
+    """
+    Résout un cas sans interface graphique et sans garder l'historique, et n'en garde que des résultats réduits.
+
+    Arguments:
+        parametres (dict): Les paramètres de `EquationChaleur` (conditions aux limites comprises).
+        sondes (list): Les positions relatives des points suivis au cours du temps (interpolées).
+        tolerance (float): Écart maximal de température entre deux pas (en °C) en dessous duquel
+                           on considère le régime stationnaire atteint et on arrête le calcul
+                           (None pour aller jusqu'au bout). Un paramètre `tolerance` du cas est prioritaire.
+
+    Retourne:
+        dict: Les paramètres du cas, le champ final (`T_finale`), les instants (`temps`), les températures
+              aux sondes (`sondes`, un instant par ligne), l'instant où le régime stationnaire est atteint
+              (`t_stationnaire`, None s'il ne l'est pas) et la durée du calcul (`duree_calcul`).
+    """
+    debut = time.perf_counter()
+    equation = EquationChaleur(**{'tolerance': tolerance, **parametres}, differe=True)
+    # interpolation des sondes calculée une seule fois
+    interpolation = equation.PreparerSondes(list(sondes))
+
+    # la simulation s'arrête d'elle-même une fois le régime stationnaire atteint
+    temps, series = [], []
+    for n, T in equation.Flux():
+        temps.append(n * equation.dt)
+        series.append(utils.interpoler_sondes(T, interpolation))
+    T_finale = T.copy()
+
+    resultat = dict(parametres)
+    resultat.update({
+        'schema': equation.schema,
+        'T_finale': T_finale,
+        'temps': np.array(temps),
+        'sondes': np.array(series).reshape(len(temps), len(sondes)),
+        't_stationnaire': equation.t_stationnaire,
+        'duree_calcul': time.perf_counter() - debut,
+    })
+    return resultat
+
+
+def _resoudre_cas(arguments):
+    """
+    Résout un cas dans un processus du balayage (les arguments sont regroupés pour `imap`).
+    """
+    return resoudre_cas(*arguments)
+
+
+def balayer(grille, sondes=(), tolerance=1e-3, processus=None, taches_par_processus=10):
+    """
+    Résout tous les cas d'une grille de paramètres en parallèle, sur un ensemble de processus.
+    Chaque cas est résolu sans historique, la mémoire par processus reste donc bornée,
+    et les processus sont renouvelés régulièrement. Le schéma des cas qui n'en imposent pas est choisi
+    avant le lancement des processus, le même pour tous les cas d'une même grille.
+    Sous Windows, l'appel doit se faire dans un bloc `if __name__ == '__main__':`.
+
+    Arguments:
+        grille (dict ou list[dict]): La grille de paramètres (voir `combinaisons`). Les conditions aux limites
+                                     (Tg, Td, et Tb, Th en 2D, Tav, Tar en 3D) doivent y figurer.
+        sondes (list): Les positions relatives des points suivis au cours du temps.
+        tolerance (float): Écart de température entre deux pas définissant le régime stationnaire.
+        processus (int): Nombre de processus (par défaut le nombre de cœurs).
+        taches_par_processus (int): Nombre de cas résolus par un processus avant d'être remplacé.
+
+    Retourne:
+        list[dict]: Une ligne de résultats par cas (voir `resoudre_cas`), dans l'ordre de la grille.
+
+    Lève une erreur si des conditions aux limites manquent (elles seraient demandées à l'utilisateur)
+    ou si la grille fixe un paramètre imposé par le balayage (`differe`).
+    """
+    cas = combinaisons(grille)
+    for parametres in cas:
+        reserves = RESERVES & set(parametres)
+        if reserves:
+            raise ValueError(f"Paramètres imposés par le balayage : {', '.join(sorted(reserves))}.")
+        dimension = parametres.get('dimension')
+        manquantes = ({'Tg', 'Td'} | ({'Tb', 'Th'} if dimension in ('2D', '3D') else set())
+                      | ({'Tav', 'Tar'} if dimension == '3D' else set()))
+        manquantes -= set(parametres)
+        if manquantes:
+            raise ValueError(f"Conditions aux limites manquantes : {', '.join(sorted(manquantes))}.")
+
+    taches = []
+    for parametres in cas:
+        if parametres.get('schema') is None:
+            # le schéma est choisi ici, une seule fois par grille (les mesures de coût sont gardées d'un cas
+            # à l'autre) : mesuré dans des processus chargés et renouvelés, il pourrait différer entre des cas
+            # de même grille, et les résultats du balayage ne seraient pas reproductibles
+            equation = EquationChaleur(**{'tolerance': tolerance, **parametres}, differe=True)
+            parametres = {**parametres, 'schema': equation.schema}
+        taches.append((parametres, sondes, tolerance))
+    with multiprocessing.Pool(processus, maxtasksperchild=taches_par_processus) as pool:
+        return list(pool.imap(_resoudre_cas, taches))
+
+
+def ecrire_csv(resultats, chemin):
+    """
+    Écrit les colonnes scalaires des résultats d'un balayage (paramètres, schéma, régime stationnaire,
+    durée du calcul) dans un fichier CSV, une ligne par cas.
+
+    Arguments:
+        resultats (list[dict]): Les résultats de `balayer`.
+        chemin (str): Le chemin du fichier CSV.
+    """
+    colonnes = [cle for cle, valeur in resultats[0].items() if not isinstance(valeur, np.ndarray)]
+    for resultat in resultats[1:]:
+        colonnes += [cle for cle, valeur in resultat.items()
+                     if cle not in colonnes and not isinstance(valeur, np.ndarray)]
+
+    with open(chemin, 'w', newline='', encoding='utf-8') as fichier:
+        ecrivain = csv.DictWriter(fichier, fieldnames=colonnes, extrasaction='ignore')
+        ecrivain.writeheader()
+        ecrivain.writerows(resultats)
@@ -0,0 +1,276 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import utils
+from ressim import EquationChaleur
+
+
+def pas_explicite_boucles(T_avant, r):
+    """
+    Pas d'Euler explicite de référence, écrit avec des boucles sur les indices (ancienne version).
+
+    Arguments:
+        T_avant (numpy.ndarray): Températures à l'instant d'avant (1D ou 2D).
+        r (float): Coefficient r = D.dt/dx².
+
+    Retourne:
+        numpy.ndarray: Les températures à l'instant suivant (bords à 0).
+    """
+    T_mtn = np.zeros_like(T_avant)
+    if T_avant.ndim == 1:
+        for i in range(1, len(T_avant) - 1):
+            T_mtn[i] = T_avant[i] + r * (T_avant[i - 1] - 2 * T_avant[i] + T_avant[i + 1])
+    else:
+        for i in range(1, T_avant.shape[0] - 1):
+            for j in range(1, T_avant.shape[1] - 1):
+                T_mtn[i, j] = (
+                    T_avant[i, j]
+                    + r * (T_avant[i - 1, j] - 2 * T_avant[i, j] + T_avant[i + 1, j])
+                    + r * (T_avant[i, j - 1] - 2 * T_avant[i, j] + T_avant[i, j + 1])
+                )
+    return T_mtn
+
+
+def iterer(T, r, Nt, methode):
+    """
+    Avance Nt pas d'Euler explicite avec des bords fixés à leurs valeurs initiales.
+
+    Arguments:
+        T (numpy.ndarray): Températures initiales (bords compris).
+        r (float): Coefficient r = D.dt/dx².
+        Nt (int): Nombre de pas.
+        methode (str): 'boucles', 'vectorise' ou 'en_place' (double tampon, sans allocation par pas).
+
+    Retourne:
+        numpy.ndarray: Les températures après Nt pas.
+    """
+    interieur = (slice(1, -1),) * T.ndim
+    if methode == 'en_place':
+        # deux tampons qui alternent, les bords sont copiés une seule fois
+        T_avant, T_mtn = T.copy(), T.copy()
+        travail = np.empty_like(T[interieur])
+        for _ in range(Nt):
+            utils.pas_explicite(T_avant, r, T_mtn, travail)
+            T_avant, T_mtn = T_mtn, T_avant
+        return T_avant
+
+    # masque des bords
+    bords = np.ones(T.shape, dtype=bool)
+    bords[interieur] = False
+
+    T_avant = T.copy()
+    for _ in range(Nt):
+        if methode == 'boucles':
+            T_mtn = pas_explicite_boucles(T_avant, r)
+        else:
+            T_mtn = utils.pas_explicite(T_avant, r)
+        # on réinitialise les bords (CL Dirichlet)
+        T_mtn[bords] = T[bords]
+        T_avant = T_mtn
+    return T_avant
+
+
+def chronometrer(fonction, *args):
+    """
+    Mesure la durée d'exécution d'une fonction.
+
+    Retourne:
+        tuple: (résultat, durée en secondes).
+    """
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return resultat, time.perf_counter() - debut
+
+
+def benchmark_explicite(Nx=200, Nt=200, r=0.2):
+    """
+    Compare les boucles Python et le noyau vectorisé du schéma explicite en 1D et en 2D,
+    vérifie que les résultats sont identiques au bit près et affiche l'accélération.
+
+    Arguments:
+        Nx (int): Nombre de pas d'espace.
+        Nt (int): Nombre de pas de temps.
+        r (float): Coefficient r = D.dt/dx² (r < 0.25 pour rester stable en 2D).
+    """
+    rng = np.random.default_rng(0)
+    for dimension, forme in (('1D', (Nx,)), ('2D', (Nx, Nx))):
+        T = 20 + 70 * rng.random(forme)
+        reference, duree_boucles = chronometrer(iterer, T, r, Nt, 'boucles')
+        print(f"{dimension} Nx={Nx} Nt={Nt} : boucles {duree_boucles:.3f} s")
+        for methode in ('vectorise', 'en_place'):
+            resultat, duree = chronometrer(iterer, T, r, Nt, methode)
+            identique = np.array_equal(resultat, reference)
+            print(f"    {methode:<9} {duree:.4f} s (x{duree_boucles / duree:.1f}), identique : {identique}")
+
+
+def benchmark_tridiagonale(tailles=(10, 20, 40, 100, 200, 400, 1000), repetitions=200):
+    """
+    Compare, pour un seul second membre (cas 1D), la résolution tridiagonale préfactorisée sur des flottants
+    Python, la même boucle sur des tableaux numpy (utilisée quand il y a plusieurs seconds membres)
+    et `numpy.linalg.solve` sur la matrice pleine, puis affiche la taille à partir de laquelle
+    la résolution tridiagonale devient plus rapide que la résolution pleine.
+
+    Arguments:
+        tailles (tuple): Les tailles n des systèmes mesurés.
+        repetitions (int): Nombre de résolutions chronométrées pour chaque mesure.
+    """
+    rng = np.random.default_rng(0)
+    croisement = None
+    for n in tailles:
+        A = utils.diagonales_tridiagonales(n, 1.5, -0.25)
+        factorisation = utils.factoriser_tridiagonale(A)
+        pleine = utils.matrice_tridiagonale(n, 1.5, -0.25)
+        B = rng.random(n)
+        colonne = B[:, None]
+
+        def repeter(fonction, *args):
+            return chronometrer(lambda: [fonction(*args) for _ in range(repetitions)])[1] / repetitions
+
+        scalaire = min(repeter(utils.resoudre_tridiagonale, factorisation, B) for _ in range(3))
+        vectorise = min(repeter(utils.resoudre_tridiagonale, factorisation, colonne) for _ in range(3))
+        dense = min(repeter(np.linalg.solve, pleine, B) for _ in range(3))
+        if croisement is None and scalaire < dense:
+            croisement = n
+        print(f"n={n:<5} flottants {scalaire * 1e6:8.1f} µs   numpy (n × 1) {vectorise * 1e6:8.1f} µs   "
+              f"pleine {dense * 1e6:9.1f} µs")
+    print("tridiagonale plus rapide que la résolution pleine dès n =", croisement)
+
+
+def mesurer(fonction, *args, repetitions=3):
+    """
+    Mesure la durée d'exécution d'une fonction (meilleure de plusieurs exécutions)
+    et le pic de mémoire allouée pendant une exécution supplémentaire suivie par `tracemalloc`
+    (le suivi ralentit l'exécution, il n'est donc pas actif pendant le chronométrage).
+
+    Arguments:
+        fonction (callable): La fonction à mesurer.
+        repetitions (int): Nombre d'exécutions chronométrées.
+
+    Retourne:
+        tuple: (durée en secondes, pic de mémoire en octets).
+    """
+    duree = min(chronometrer(fonction, *args)[1] for _ in range(repetitions))
+    tracemalloc.start()
+    try:
+        fonction(*args)
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return duree, pic
+
+
+def creer_equation(dimension, Nx, Nt, schema):
+    """
+    Crée une simulation sans saisie interactive (conditions aux limites données) et sans la résoudre.
+    Le schéma explicite est découpé en sous-pas si nécessaire pour rester stable.
+    """
+    conditions = {'Tg': 90, 'Td': 40} if dimension == '1D' else {'Tg': 90, 'Td': [20, 90], 'Tb': 40, 'Th': 60}
+    return EquationChaleur(dimension, 'Aluminium', Nx=Nx, Nt=Nt, differe=True, schema=schema, **conditions)
+
+
+def sonder(equation, rapport):
+    """
+    Suit un point sur tout l'historique comme dans `Simuler` : interpolation précalculée une seule fois,
+    puis appliquée à chaque instant.
+
+    Retourne:
+        list: La température du point à chaque instant.
+    """
+    sondes = equation.PreparerSondes(rapport)
+    return [utils.interpoler_sondes(T, sondes) for T in equation.Tfs]
+
+
+def benchmark_suite(grilles=None, repetitions=3):
+    """
+    Mesure les solveurs (`EulerExplicite`, `EulerImplicite`), le calcul des couleurs (`ObtenirCouleur`)
+    et le suivi d'un point (interpolation précalculée, appliquée à chaque instant) en 1D et en 2D
+    pour plusieurs tailles de grille. Ni `vpython` ni saisie interactive ne sont nécessaires.
+
+    Arguments:
+        grilles (list): Des triplets (dimension, Nx, Nt) à mesurer (par défaut `GRILLES`).
+        repetitions (int): Nombre d'exécutions chronométrées de chaque opération (on garde la plus rapide).
+
+    Retourne:
+        list[dict]: Une mesure par opération et par grille : durée, pas par seconde,
+                    cellules·pas par seconde et pic de mémoire.
+    """
+    resultats = []
+    for dimension, Nx, Nt in GRILLES if grilles is None else grilles:
+        cellules = Nx if dimension == '1D' else Nx * Nx
+        explicite = creer_equation(dimension, Nx, Nt, 'explicite')
+        implicite = creer_equation(dimension, Nx, Nt, 'implicite')
+        # historique pour les couleurs et le suivi de point
+        implicite.indices, implicite.Tfs = implicite.Resoudre()
+
+        operations = {
+            'EulerExplicite': (explicite.EulerExplicite, explicite.sous_pas),
+            'EulerImplicite': (implicite.EulerImplicite, 1),
+            'ObtenirCouleur': (lambda: [couleurs for _, _, couleurs in implicite.ObtenirCouleur], 1),
+            'sonde': (lambda: sonder(implicite, 0.3 if dimension == '1D' else [0.3, 0.6]), 1),
+        }
+        for operation, (fonction, sous_pas) in operations.items():
+            duree, pic = mesurer(fonction, repetitions=repetitions)
+            pas = Nt * sous_pas
+            resultats.append({
+                'operation': operation,
+                'dimension': dimension,
+                'Nx': Nx,
+                'Nt': Nt,
+                'sous_pas': sous_pas,
+                'duree': duree,
+                'pas_par_s': pas / duree,
+                'cellules_pas_par_s': cellules * pas / duree,
+                'memoire_pic': pic,
+            })
+    return resultats
+
+
+def environnement():
+    """
+    Décrit la machine et les versions utilisées, pour comparer des mesures entre elles.
+    """
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'plateforme': platform.platform(),
+        'processeur': platform.processor() or platform.machine(),
+    }
+
+
+# tailles de grille mesurées par défaut : (dimension, Nx, Nt)
+GRILLES = [
+    ('1D', 50, 1000), ('1D', 200, 1000), ('1D', 1000, 1000),
+    ('2D', 20, 200), ('2D', 50, 200), ('2D', 100, 200),
+]
+
+
+if __name__ == '__main__':
+    parseur = argparse.ArgumentParser(description="Mesure les performances du solveur de l'équation de la chaleur.")
+    parseur.add_argument('--sortie', help="fichier JSON des résultats (par défaut la sortie standard)")
+    parseur.add_argument('--repetitions', type=int, default=3, help="nombre d'exécutions chronométrées")
+    parseur.add_argument('--grille', nargs=3, action='append', metavar=('DIMENSION', 'NX', 'NT'),
+                         help="grille à mesurer (répétable), par exemple --grille 2D 50 200")
+    parseur.add_argument('--explicite', action='store_true',
+                         help="compare seulement les boucles Python et le noyau vectorisé du schéma explicite")
+    parseur.add_argument('--tridiagonale', action='store_true',
+                         help="compare seulement les résolutions tridiagonale et pleine d'un système 1D")
+    arguments = parseur.parse_args()
+
+    if arguments.explicite:
+        benchmark_explicite()
+    elif arguments.tridiagonale:
+        benchmark_tridiagonale()
+    else:
+        grilles = None if arguments.grille is None else [(d, int(nx), int(nt)) for d, nx, nt in arguments.grille]
+        rapport = {'environnement': environnement(),
+                   'resultats': benchmark_suite(grilles, arguments.repetitions)}
+        if arguments.sortie is None:
+            json.dump(rapport, sys.stdout, indent=2)
+            print()
+        else:
+            with open(arguments.sortie, 'w', encoding='utf-8') as fichier:
+                json.dump(rapport, fichier, indent=2)
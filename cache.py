@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+import stockage
+
+# version des schémas de résolution : à incrémenter dès qu'une modification change les résultats ou les métadonnées
+# relues, les simulations mises en cache par une version précédente ne sont alors plus relues
+VERSION_SOLVEUR = 2
+
+# taille maximale par défaut du cache (en octets)
+TAILLE_MAX = 1 << 30
+
+
+def cle(description):
+    """
+    Calcule la clé d'une simulation dans le cache : l'empreinte SHA-256 de sa description
+    (paramètres, schéma, sortie) et de la version du solveur.
+
+    Arguments:
+        description (dict): Tout ce dont dépendent les résultats.
+
+    Retourne:
+        str: La clé (64 caractères hexadécimaux), ou None si la description n'est pas sérialisable
+             (par exemple une condition aux limites donnée par une fonction du temps).
+    """
+    try:
+        texte = json.dumps({'version': VERSION_SOLVEUR, **description}, default=stockage._convertir,
+                           sort_keys=True, ensure_ascii=False)
+    except TypeError:
+        return None
+    return hashlib.sha256(texte.encode('utf-8')).hexdigest()
+
+
+def _chemin(dossier, cle):
+    """
+    Renvoie le chemin du fichier d'une simulation dans le cache.
+    """
+    return os.path.join(dossier, cle + '.npz')
+
+
+def lire(dossier, cle):
+    """
+    Relit une simulation du cache et la marque comme la plus récemment utilisée.
+
+    Arguments:
+        dossier (str): Le dossier du cache.
+        cle (str): La clé de la simulation (voir `cle`).
+
+    Retourne:
+        tuple (numpy.ndarray, numpy.ndarray, dict): Les indices des pas de temps, les instantanés
+                                                    et les métadonnées, ou None si la simulation n'y est pas.
+    """
+    chemin = _chemin(dossier, cle)
+    try:
+        with np.load(chemin, allow_pickle=False) as contenu:
+            indices, etats = contenu['indices'], contenu['etats']
+            metadonnees = json.loads(str(contenu['metadonnees']))
+    except (OSError, KeyError, ValueError):
+        # absente, ou supprimée entre-temps par un autre processus
+        return None
+    try:
+        # la date de modification sert à l'ordre d'éviction
+        os.utime(chemin)
+    except OSError:
+        pass
+    return indices, etats, metadonnees
+
+
+def ecrire(dossier, cle, indices, etats, metadonnees, taille_max=TAILLE_MAX):
+    """
+    Écrit une simulation dans le cache, compressée, avec ses métadonnées, puis supprime les simulations
+    les moins récemment utilisées si le cache dépasse sa taille maximale.
+    L'écriture passe par un fichier temporaire renommé : plusieurs processus peuvent utiliser le même cache,
+    un lecteur ne voit jamais de fichier à moitié écrit.
+
+    Arguments:
+        dossier (str): Le dossier du cache (créé s'il n'existe pas).
+        cle (str): La clé de la simulation (voir `cle`).
+        indices (numpy.ndarray): Les indices des pas de temps conservés.
+        etats (numpy.ndarray): Les instantanés correspondants.
+        metadonnees (dict): Les métadonnées (sérialisables en JSON).
+        taille_max (int): La taille maximale du cache (en octets).
+    """
+    os.makedirs(dossier, exist_ok=True)
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix='.tmp')
+    try:
+        with os.fdopen(descripteur, 'wb') as fichier:
+            np.savez_compressed(fichier, indices=indices, etats=etats,
+                                metadonnees=np.array(json.dumps(metadonnees, default=stockage._convertir,
+                                                                ensure_ascii=False)))
+        os.replace(temporaire, _chemin(dossier, cle))
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+    evincer(dossier, taille_max)
+
+
+def evincer(dossier, taille_max=TAILLE_MAX):
+    """
+    Supprime les simulations les moins récemment utilisées jusqu'à ce que le cache ne dépasse plus
+    sa taille maximale.
+
+    Arguments:
+        dossier (str): Le dossier du cache.
+        taille_max (int): La taille maximale du cache (en octets).
+    """
+    fichiers = []
+    for entree in os.scandir(dossier):
+        if entree.name.endswith('.npz'):
+            try:
+                etat = entree.stat()
+            except OSError:
+                continue
+            fichiers.append((etat.st_mtime, etat.st_size, entree.path))
+    taille = sum(octets for _, octets, _ in fichiers)
+    for _, octets, chemin in sorted(fichiers):
+        if taille <= taille_max:
+            break
+        try:
+            os.remove(chemin)
+        except OSError:
+            # déjà supprimée par un autre processus
+            pass
+        taille -= octets
@@ -0,0 +1,187 @@
+import argparse
+import multiprocessing
+import os
+import struct
+import zlib
+import numpy as np
+import stockage
+import utils
+
+# instantanés lus par chaque processus de l'export (ouverts une seule fois par processus)
+_etats = None
+
+
+def palette_rgb(taille=1000):
+    """
+    Précalcule la table des couleurs de `utils.palette_couleurs` en octets (0 à 255), pour les images.
+
+    Arguments:
+        taille (int): Nombre de couleurs de la table.
+
+    Retourne:
+        numpy.ndarray: La table des couleurs (r, g, b), de forme (taille, 3) et de type uint8.
+    """
+    return (utils.palette_couleurs(taille) * 255 + 0.5).astype(np.uint8)
+
+
+def image(T, temp_min, temp_max, palette, echelle=4, hauteur=16):
+    """
+    Convertit les températures d'un instant en image RGB, avec la même palette que la visualisation.
+    En 2D, l'axe y est vertical et vers le haut, comme dans `CreerElement`. En 3D, on représente
+    le plan du milieu du bloc selon z, comme `Coupe`.
+
+    Arguments:
+        T (numpy.ndarray): Les températures de la barre, de la plaque ou du bloc.
+        temp_min (float): Température minimale de la série.
+        temp_max (float): Température maximale de la série.
+        palette (numpy.ndarray): La table des couleurs de `palette_rgb`.
+        echelle (int): Nombre de pixels (de côté) par point de la grille.
+        hauteur (int): Hauteur de l'image d'une barre (1D), en pixels.
+
+    Retourne:
+        numpy.ndarray: L'image, de forme (hauteur, largeur, 3) et de type uint8.
+    """
+    if T.ndim == 3:
+        T = T[..., T.shape[-1] // 2]
+    indices = utils.indices_couleurs(T, temp_min, temp_max, len(palette))
+    if indices.ndim == 1:
+        indices = np.repeat(indices[np.newaxis, :], hauteur, axis=0)
+        indices = np.repeat(indices, echelle, axis=1)
+    else:
+        # une ligne de l'image par point selon y, la première en haut
+        indices = indices.T[::-1]
+        indices = np.repeat(np.repeat(indices, echelle, axis=0), echelle, axis=1)
+    return palette[indices]
+
+
+def _bloc_png(type_bloc, contenu):
+    """
+    Met en forme un bloc d'un fichier PNG : longueur, type, contenu et somme de contrôle CRC.
+    """
+    return (struct.pack('>I', len(contenu)) + type_bloc + contenu
+            + struct.pack('>I', zlib.crc32(type_bloc + contenu) & 0xffffffff))
+
+
+def ecrire_png(chemin, image, compression=6):
+    """
+    Écrit une image RGB dans un fichier PNG, avec la seule bibliothèque standard (zlib et struct).
+
+    Arguments:
+        chemin (str): Le chemin du fichier.
+        image (numpy.ndarray): L'image, de forme (hauteur, largeur, 3) et de type uint8.
+        compression (int): Le niveau de compression zlib (0 à 9).
+    """
+    hauteur, largeur = image.shape[:2]
+    # chaque ligne est précédée de son filtre (0 : aucun)
+    lignes = np.zeros((hauteur, 1 + 3 * largeur), dtype=np.uint8)
+    lignes[:, 1:] = image.reshape(hauteur, 3 * largeur)
+    entete = struct.pack('>IIBBBBB', largeur, hauteur, 8, 2, 0, 0, 0)
+    with open(chemin, 'wb') as fichier:
+        fichier.write(b'\x89PNG\r\n\x1a\n')
+        fichier.write(_bloc_png(b'IHDR', entete))
+        fichier.write(_bloc_png(b'IDAT', zlib.compress(lignes.tobytes(), compression)))
+        fichier.write(_bloc_png(b'IEND', b''))
+
+
+def _initialiser(source):
+    """
+    Ouvre les instantanés dans un processus de l'export : un historique enregistré est projeté
+    en mémoire depuis le disque, chaque processus ne lit donc que les instantanés qu'il encode.
+    """
+    global _etats
+    _etats = stockage.ouvrir(source)[2] if isinstance(source, str) else source
+
+
+def _encoder_bloc(arguments):
+    """
+    Encode un bloc d'instantanés dans un processus de l'export : en fichiers PNG numérotés,
+    ou en images RGB brutes renvoyées pour être écrites dans l'ordre.
+    """
+    numeros, instants, sortie, format, temp_min, temp_max, options = arguments
+    palette = palette_rgb(options['taille'])
+    if format == 'png':
+        for numero, k in zip(numeros, instants):
+            rgb = image(_etats[k], temp_min, temp_max, palette, options['echelle'], options['hauteur'])
+            ecrire_png(os.path.join(sortie, f"image_{numero:06d}.png"), rgb, options['compression'])
+        return len(instants)
+    return b''.join(image(_etats[k], temp_min, temp_max, palette, options['echelle'], options['hauteur']).tobytes()
+                    for k in instants)
+
+
+def exporter(source, sortie, format='png', saut=1, temp_min=None, temp_max=None, echelle=4, hauteur=16,
+             taille=1000, compression=6, processus=None, taille_bloc=32):
+    """
+    Exporte les instantanés d'une simulation en images, sans vpython et sans attendre l'affichage en temps réel :
+    une suite de fichiers PNG (`image_000000.png`, ...) ou un flux vidéo RGB brut, que l'on peut convertir par
+    exemple avec `ffmpeg -f rawvideo -pix_fmt rgb24 -s LARGEURxHAUTEUR -r 25 -i video.rgb video.mp4`.
+    Les images sont encodées en parallèle, par blocs d'instantanés, sur un ensemble de processus.
+    Sous Windows, l'appel doit se faire dans un bloc `if __name__ == '__main__':`.
+
+    Arguments:
+        source (str ou numpy.ndarray): Le chemin d'un historique enregistré (`Enregistrer`), lu directement
+                                       dans le fichier par chaque processus, ou les instantanés (un par ligne).
+        sortie (str): Le dossier des images PNG, ou le fichier de la vidéo brute.
+        format (str): 'png' ou 'rgb' (vidéo brute).
+        saut (int): On n'exporte qu'un instantané sur `saut` (et le dernier).
+        temp_min, temp_max (float): Les bornes de la palette, par défaut les extrêmes de l'historique.
+        echelle (int): Nombre de pixels (de côté) par point de la grille.
+        hauteur (int): Hauteur de l'image d'une barre (1D), en pixels.
+        taille (int): Nombre de couleurs de la palette.
+        compression (int): Le niveau de compression des PNG (0 à 9).
+        processus (int): Nombre de processus (par défaut le nombre de cœurs, 1 pour tout encoder sur place).
+        taille_bloc (int): Nombre d'instantanés encodés par tâche.
+
+    Retourne:
+        tuple (int, int, int): Le nombre d'images, leur largeur et leur hauteur (en pixels).
+    """
+    if format not in ('png', 'rgb'):
+        raise ValueError("`format` doit être `png` ou `rgb`.")
+    etats = stockage.ouvrir(source)[2] if isinstance(source, str) else np.asarray(source)
+    if temp_min is None or temp_max is None:
+        extremes = utils.extremes(etats)
+        temp_min = extremes[0] if temp_min is None else temp_min
+        temp_max = extremes[1] if temp_max is None else temp_max
+
+    options = {'echelle': echelle, 'hauteur': hauteur, 'taille': taille, 'compression': compression}
+    forme = image(etats[0], temp_min, temp_max, palette_rgb(taille), echelle, hauteur).shape
+    instants = list(utils.echantillonner(range(len(etats)), saut))
+    taches = [(range(debut, debut + taille_bloc), instants[debut:debut + taille_bloc], sortie, format,
+               temp_min, temp_max, options) for debut in range(0, len(instants), taille_bloc)]
+
+    if format == 'png':
+        os.makedirs(sortie, exist_ok=True)
+    if processus == 1:
+        _initialiser(etats)
+        pool, blocs = None, map(_encoder_bloc, taches)
+    else:
+        pool = multiprocessing.Pool(processus, initializer=_initialiser, initargs=(source,))
+        # les blocs arrivent dans l'ordre, la vidéo est écrite au fur et à mesure
+        blocs = pool.imap(_encoder_bloc, taches)
+    try:
+        if format == 'png':
+            for _ in blocs:
+                pass
+        else:
+            with open(sortie, 'wb') as fichier:
+                for bloc in blocs:
+                    fichier.write(bloc)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return len(instants), forme[1], forme[0]
+
+
+if __name__ == '__main__':
+    parseur = argparse.ArgumentParser(description="Exporte un historique enregistré en images PNG ou en vidéo RGB brute.")
+    parseur.add_argument('historique', help="fichier .npy de l'historique (voir `EquationChaleur.Enregistrer`)")
+    parseur.add_argument('sortie', help="dossier des images PNG, ou fichier de la vidéo brute")
+    parseur.add_argument('--format', choices=('png', 'rgb'), default='png', help="format de sortie")
+    parseur.add_argument('--saut', type=int, default=1, help="on n'exporte qu'un instantané sur SAUT")
+    parseur.add_argument('--echelle', type=int, default=4, help="nombre de pixels par point de la grille")
+    parseur.add_argument('--processus', type=int, help="nombre de processus (par défaut le nombre de cœurs)")
+    arguments = parseur.parse_args()
+
+    nombre, largeur, hauteur = exporter(arguments.historique, arguments.sortie, arguments.format, arguments.saut,
+                                        echelle=arguments.echelle, processus=arguments.processus)
+    print(f"{nombre} images de {largeur}x{hauteur} pixels exportées dans {arguments.sortie}")
@@ -0,0 +1,459 @@
+import copy
+import numpy as np
+import utils
+
+
+class Dirichlet:
+    """
+    Température imposée sur un bord.
+
+    Attributs:
+        valeur (float, list[float] ou callable): La température (en °C) : un nombre, une liste de deux éléments
+                                                 pour une température en triangle le long du bord, ou une fonction
+                                                 du temps. La fonction reçoit le tableau de tous les instants
+                                                 et renvoie pour chacun la température (un nombre, ou un profil
+                                                 le long du bord, de forme (instants, points du bord)).
+    """
+
+    def __init__(self, valeur):
+        self.valeur = valeur
+
+    def Parametres(self):
+        """
+        Renvoie la description de la condition (pour l'enregistrer avec la simulation).
+        """
+        if callable(self.valeur):
+            raise TypeError("Une condition de Dirichlet variable dans le temps ne peut pas être enregistrée.")
+        return {'type': 'Dirichlet', 'valeur': self.valeur}
+
+
+class Neumann:
+    """
+    Flux imposé sur un bord : la dérivée de la température selon la normale sortante vaut `flux`.
+
+    Attributs:
+        flux (float): La dérivée normale sortante imposée (en °C/mm), 0 pour un bord isolé.
+    """
+
+    def __init__(self, flux=0.0):
+        self.flux = flux
+
+    def Parametres(self):
+        """
+        Renvoie la description de la condition (pour l'enregistrer avec la simulation).
+        """
+        return {'type': 'Neumann', 'flux': self.flux}
+
+
+class Robin:
+    """
+    Échange convectif sur un bord : la dérivée de la température selon la normale sortante
+    vaut -h (T - T_ext).
+
+    Attributs:
+        h (float): Le coefficient d'échange rapporté à la conductivité (en 1/mm).
+        T_ext (float): La température du milieu extérieur (en °C).
+    """
+
+    def __init__(self, h, T_ext):
+        self.h = h
+        self.T_ext = T_ext
+
+    def Parametres(self):
+        """
+        Renvoie la description de la condition (pour l'enregistrer avec la simulation).
+        """
+        return {'type': 'Robin', 'h': self.h, 'T_ext': self.T_ext}
+
+
+def condition(valeur):
+    """
+    Convertit une condition aux limites donnée par l'utilisateur : un nombre, une liste ou une fonction
+    du temps sont des conditions de Dirichlet, un dictionnaire est la description d'une condition
+    enregistrée (voir `Parametres`).
+
+    Arguments:
+        valeur: La condition.
+
+    Retourne:
+        Dirichlet, Neumann ou Robin: La condition.
+    """
+    if isinstance(valeur, (Dirichlet, Neumann, Robin)):
+        return valeur
+    if isinstance(valeur, dict):
+        description = dict(valeur)
+        types = {'Dirichlet': Dirichlet, 'Neumann': Neumann, 'Robin': Robin}
+        return types[description.pop('type')](**description)
+    return Dirichlet(valeur)
+
+
+class Bords:
+    """
+    Conditions aux limites d'une grille, précalculées une fois pour toutes et appliquées en place.
+
+    Les bords de Dirichlet sont réimposés après chaque pas avec des profils précalculés (évalués pour
+    tous les instants d'un coup s'ils varient dans le temps). Les bords à flux imposé (Neumann, Robin)
+    sont des inconnues comme les points intérieurs : on les traite avec un point fantôme au-delà du bord,
+    u_fantome = u_voisin + 2 d (g - h u_bord), qui s'intègre au schéma explicite et aux matrices implicites.
+    Aux coins, un bord de Dirichlet l'emporte, et les bords du dernier axe l'emportent sur ceux du premier.
+    Les axes d'espace sont les derniers axes des tableaux : des conditions empilées (`empiler`) s'appliquent
+    à plusieurs scénarios à la fois, séparés par le premier axe.
+
+    Attributs:
+        forme (tuple): La forme de la grille.
+        lots (tuple): La forme des axes des scénarios (vide pour une seule simulation).
+        pas (tuple): Le pas d'espace de chaque axe.
+        conditions (list): Pour chaque axe, les conditions au début et à la fin de l'axe.
+        flux (list): Les bords à flux imposé, des tuples (axe, côté, h, g) avec côté 0 ou -1.
+        fixes (bool): True si tous les bords sont de Dirichlet et constants dans le temps.
+    """
+
+    def __init__(self, conditions, forme, pas):
+        """
+        Précalcule les conditions aux limites.
+
+        Arguments:
+            conditions (list): Pour chaque axe, un couple (début, fin) de conditions
+                               (nombres, listes, fonctions du temps ou `Dirichlet`, `Neumann`, `Robin`).
+            forme (tuple): La forme de la grille.
+            pas (tuple): Le pas d'espace de chaque axe.
+        """
+        self.forme = tuple(forme)
+        self.pas = tuple(pas)
+        self.lots = ()
+        self.conditions = [tuple(condition(valeur) for valeur in couple) for couple in conditions]
+
+        # bords de Dirichlet : (plan du tableau, profil constant ou fonction du temps, variable, forme du plan)
+        self._dirichlet = []
+        self.flux = []
+        for axe, couple in enumerate(self.conditions):
+            # longueur de chaque axe le long du bord
+            plan_forme = self.forme[:axe] + self.forme[axe + 1:]
+            for cote, bord in zip((0, -1), couple):
+                plan = (Ellipsis, cote) + (slice(None),) * (len(self.forme) - 1 - axe)
+                if isinstance(bord, Dirichlet):
+                    if callable(bord.valeur):
+                        self._dirichlet.append((plan, bord.valeur, True, plan_forme))
+                    elif isinstance(bord.valeur, list):
+                        # le long du premier axe du bord (uniforme selon le second en 3D)
+                        profil = np.linspace(bord.valeur[0], bord.valeur[1], plan_forme[0])
+                        profil = profil.reshape(profil.shape + (1,) * (len(plan_forme) - 1))
+                        self._dirichlet.append((plan, profil, False, plan_forme))
+                    else:
+                        self._dirichlet.append((plan, np.asarray(bord.valeur, dtype=float), False, plan_forme))
+                elif isinstance(bord, Neumann):
+                    self.flux.append((axe, cote, 0.0, float(bord.flux)))
+                else:
+                    self.flux.append((axe, cote, float(bord.h), float(bord.h) * float(bord.T_ext)))
+
+        self.fixes = not self.flux and not any(variable for _, _, variable, _ in self._dirichlet)
+        # valeurs initiales (et valeurs permanentes des bords constants)
+        self._initiales = self.Valeurs(np.zeros(1))
+
+    def Valeurs(self, temps):
+        """
+        Évalue les conditions de Dirichlet à tous les instants d'un coup.
+
+        Arguments:
+            temps (numpy.ndarray): Les instants (en s).
+
+        Retourne:
+            list: Pour chaque bord de Dirichlet, un couple (variable, valeurs) : le profil constant,
+                  ou un tableau (instants, points du bord) si la condition varie dans le temps.
+        """
+        valeurs = []
+        for _, valeur, variable, plan_forme in self._dirichlet:
+            if not variable:
+                valeurs.append((False, valeur))
+            else:
+                serie = np.asarray(valeur(np.asarray(temps, dtype=float)), dtype=float)
+                # une valeur par instant : uniforme le long du bord
+                if serie.ndim <= 1:
+                    serie = np.reshape(serie, (-1,) + (1,) * len(plan_forme))
+                valeurs.append((True, np.broadcast_to(serie, (len(temps),) + self.lots + plan_forme)))
+        return valeurs
+
+    def Imposer(self, T, valeurs=None, k=0):
+        """
+        Impose les conditions de Dirichlet sur les bords, en place.
+
+        Arguments:
+            T (numpy.ndarray): Les températures de la grille.
+            valeurs (list): Les valeurs de `Valeurs`, par défaut les valeurs initiales.
+            k (int): L'indice de l'instant dans les valeurs (pour les conditions variables).
+        """
+        valeurs = self._initiales if valeurs is None else valeurs
+        for (plan, _, _, _), (variable, valeur) in zip(self._dirichlet, valeurs):
+            T[plan] = valeur[k] if variable else valeur
+
+    def Tampons(self, nombre=2):
+        """
+        Alloue des tableaux de la forme de la grille, entourés d'une couche de points fantômes
+        s'il y a des bords à flux imposé.
+
+        Arguments:
+            nombre (int): Le nombre de tableaux.
+
+        Retourne:
+            list: Des couples (tableau complet, vue sur la grille).
+        """
+        marge = 1 if self.flux else 0
+        grille = (Ellipsis,) + (slice(marge, -marge or None),) * len(self.forme)
+        tampons = []
+        for _ in range(nombre):
+            tampon = np.zeros(self.lots + tuple(n + 2 * marge for n in self.forme))
+            tampons.append((tampon, tampon[grille]))
+        return tampons
+
+    def Fantomes(self, P):
+        """
+        Calcule les points fantômes des bords à flux imposé d'un tableau de `Tampons`, en place :
+        u_fantome = u_voisin + 2 d (g - h u_bord), la dérivée centrée au bord valant g - h u_bord.
+
+        Arguments:
+            P (numpy.ndarray): Le tableau complet (grille et points fantômes).
+        """
+        for axe, cote, h, g in self.flux:
+            # points de la grille selon les autres axes (plans d'épaisseur 1, pour rester des vues en 1D)
+            autour = [slice(1, -1)] * len(self.forme)
+            plans = []
+            for indice in ((0, 1, 2) if cote == 0 else (-1, -2, -3)):
+                autour[axe] = slice(indice, indice + 1 or None)
+                plans.append((Ellipsis,) + tuple(autour))
+            fantome, bord, voisin = plans
+            np.multiply(P[bord], -2 * self.pas[axe] * h, out=P[fantome])
+            P[fantome] += P[voisin]
+            if g:
+                P[fantome] += 2 * self.pas[axe] * g
+
+    def Source(self, coefficients):
+        """
+        Renvoie le terme constant que les bords à flux imposé ajoutent au laplacien discret :
+        2 d g / d² en unités physiques, soit 2 d g multiplié par le coefficient de l'axe.
+
+        Arguments:
+            coefficients (list): Le coefficient de chaque axe, ou celui de chacune de ses faces.
+
+        Retourne:
+            numpy.ndarray: Le terme de la forme de la grille (None s'il est nul).
+        """
+        if not any(g for _, _, _, g in self.flux):
+            return None
+        source = np.zeros(self.forme)
+        for axe, cote, _, g in self.flux:
+            source[(slice(None),) * axe + (cote,)] += self._Bord(coefficients[axe], axe, cote) * 2 * self.pas[axe] * g
+        # un bord de Dirichlet l'emporte aux coins
+        self.Imposer(source, [(False, 0.0)] * len(self._dirichlet))
+        return source
+
+    def Lignes(self, axe, r):
+        """
+        Renvoie les lignes des bords d'un axe dans les matrices tridiagonales de Crank-Nicholson
+        A = I - (r/2) L et M = I + (r/2) L : identité pour un bord de Dirichlet, sinon la ligne
+        du laplacien avec le point fantôme (-(2 + 2 d h) sur la diagonale, 2 vers le voisin).
+
+        Arguments:
+            axe (int): L'axe.
+            r (float ou numpy.ndarray): Le coefficient de l'axe, ou celui de chacune de ses faces.
+
+        Retourne:
+            list: Pour chaque côté (0 puis -1), un triplet (diagonale de A, couplage de A, diagonale de M)
+                  (le couplage de M est l'opposé de celui de A), ou None pour un bord de Dirichlet.
+        """
+        lignes = []
+        for cote in (0, -1):
+            bord = [(h, g) for a, c, h, g in self.flux if a == axe and c == cote]
+            if not bord:
+                lignes.append(None)
+                continue
+            h = bord[0][0]
+            perte = 1 + self.pas[axe] * h
+            # le point fantôme est le symétrique du voisin : même coefficient de face
+            c = self._Bord(r, axe, cote)
+            lignes.append((1 + c * perte, -c, 1 - c * perte))
+        return lignes
+
+    def _Bord(self, coefficient, axe, cote):
+        """
+        Renvoie le coefficient de la face voisine d'un bord : le coefficient de l'axe s'il est uniforme,
+        sinon le plan des faces de ce côté.
+        """
+        return coefficient[(slice(None),) * axe + (cote,)] if np.ndim(coefficient) else coefficient
+
+    def Region(self):
+        """
+        Renvoie la partie de la grille dont les températures sont inconnues : tout sauf les bords de Dirichlet.
+
+        Retourne:
+            tuple: Un découpage par axe.
+        """
+        region = []
+        for axe, n in enumerate(self.forme):
+            libres = [cote for a, cote, _, _ in self.flux if a == axe]
+            region.append(slice(0 if 0 in libres else 1, n if -1 in libres else n - 1))
+        return tuple(region)
+
+    def OperateurImplicite(self, coefficients):
+        """
+        Construit la matrice creuse I - L du système implicite sur les inconnues (`Region`), bords à flux
+        imposé compris. Les lignes des bords à flux imposé sont multipliées par 1/2 (1/4 aux coins entre
+        deux tels bords) : la matrice reste symétrique définie positive, donc adaptée au gradient conjugué.
+
+        Arguments:
+            coefficients (list): Le coefficient de chaque axe (r/2 pour Crank-Nicholson),
+                                 ou celui de chacune de ses faces (diffusivité variable).
+
+        Retourne:
+            tuple: La matrice (voir `utils.operateur_implicite`) et les poids des lignes (None s'ils valent tous 1),
+                   par lesquels il faut multiplier le second membre.
+        """
+        region = self.Region()
+        forme = tuple(len(range(*decoupe.indices(n))) for decoupe, n in zip(region, self.forme))
+        if any(np.ndim(coefficient) for coefficient in coefficients):
+            diagonale, couplages = self._OperateurVariable(coefficients, region)
+        else:
+            diagonale, couplages = utils.operateur_implicite(forme, coefficients)
+        if not self.flux:
+            return (diagonale, couplages), None
+
+        # poids de chaque axe : 1/2 sur les bords à flux imposé de cet axe
+        facteurs = []
+        for axe, n in enumerate(forme):
+            facteur = np.ones(n)
+            for a, cote, h, _ in self.flux:
+                if a == axe:
+                    facteur[cote] = 0.5
+                    # le point fantôme ajoute 2 d h à la diagonale du laplacien
+                    plan = (slice(None),) * axe + (cote,)
+                    c = self._Bord(coefficients[axe], axe, cote)
+                    if np.ndim(c):
+                        # faces du bord restreintes aux inconnues des autres axes
+                        c = c[region[:axe] + region[axe + 1:]]
+                    diagonale[plan] += c * 2 * self.pas[axe] * h
+            facteurs.append(facteur.reshape((1,) * axe + (n,) + (1,) * (len(forme) - axe - 1)))
+
+        poids = np.ones(forme)
+        for facteur in facteurs:
+            poids = poids * facteur
+        diagonale *= poids
+        # couplage pondéré entre deux voisins selon un axe : le poids des autres axes
+        for axe, couplage in enumerate(couplages):
+            for autre, facteur in enumerate(facteurs):
+                if autre != axe:
+                    couplage *= facteur
+        return (diagonale, couplages), poids
+
+    def _OperateurVariable(self, faces, region):
+        """
+        Construit la diagonale et les couplages de I - L sur les inconnues pour une diffusivité variable :
+        chaque point est couplé à ses voisins par le coefficient de leur face commune, et sa diagonale
+        est 1 plus la somme des coefficients de ses faces (la face d'un bord à flux imposé compte deux fois,
+        le point fantôme étant le symétrique du voisin).
+
+        Arguments:
+            faces (list[numpy.ndarray]): Le coefficient de chaque face, pour chaque axe.
+            region (tuple): Le découpage des inconnues (`Region`).
+
+        Retourne:
+            tuple: La diagonale et les couplages de chaque axe (voir `utils.operateur_implicite`).
+        """
+        diagonale = np.ones(self.forme)
+        couplages = []
+        for axe, coefficients in enumerate(faces):
+            decalage = (slice(None),) * axe
+            diagonale[decalage + (slice(None, -1),)] += coefficients
+            diagonale[decalage + (slice(1, None),)] += coefficients
+            for a, cote, _, _ in self.flux:
+                if a == axe:
+                    diagonale[decalage + (cote,)] += coefficients[decalage + (cote,)]
+            # faces entre deux inconnues voisines
+            entre = slice(region[axe].start, region[axe].stop - 1)
+            couplages.append(-coefficients[region[:axe] + (entre,) + region[axe + 1:]])
+        return diagonale[region], couplages
+
+    def FacteursStabilite(self):
+        """
+        Renvoie, pour chaque axe, le facteur par lequel les bords convectifs resserrent la condition
+        de stabilité du schéma explicite (1 + d h, 1 sans échange convectif).
+
+        Retourne:
+            list[float]: Un facteur par axe.
+        """
+        facteurs = [1.0] * len(self.forme)
+        for axe, _, h, _ in self.flux:
+            facteurs[axe] = max(facteurs[axe], 1 + self.pas[axe] * h)
+        return facteurs
+
+    def Natures(self):
+        """
+        Renvoie la nature de chaque bord, axe par axe : 'Dirichlet', 'Dirichlet variable' (fonction du temps),
+        'Neumann' ou 'Robin'.
+
+        Retourne:
+            tuple: Pour chaque axe, un couple (début, fin).
+        """
+        return tuple(tuple(type(bord).__name__ + (' variable' if isinstance(bord, Dirichlet) and callable(bord.valeur)
+                                                   else '') for bord in couple)
+                     for couple in self.conditions)
+
+    def Bornes(self, temps):
+        """
+        Renvoie les températures extrêmes imposées par les bords aux instants donnés : valeurs des bords
+        de Dirichlet et températures extérieures des bords de Robin (un bord isolant n'impose rien).
+        Sans source de chaleur, les températures restent entre ces bornes et celles de l'état initial.
+
+        Arguments:
+            temps (numpy.ndarray): Les instants (en s).
+
+        Retourne:
+            tuple (float, float): Les températures minimale et maximale imposées (infinies s'il n'y en a pas),
+                                  ou None si un bord de Neumann impose un flux non nul (pas de borne a priori).
+        """
+        if any(h == 0 and g != 0 for _, _, h, g in self.flux):
+            return None
+        imposees = [np.asarray(valeur) for _, valeur in self.Valeurs(temps)]
+        imposees += [np.asarray(g / h) for _, _, h, g in self.flux if h != 0]
+        return (min((valeur.min() for valeur in imposees), default=np.inf),
+                max((valeur.max() for valeur in imposees), default=-np.inf))
+
+
+def empiler(ensemble):
+    """
+    Empile les conditions aux limites de plusieurs scénarios sur la même grille, pour les calculer ensemble :
+    les tableaux des températures ont alors un premier axe de plus, un scénario par ligne.
+    Les scénarios peuvent différer par les valeurs de Dirichlet (constantes ou variables),
+    mais pas par la nature des bords ni par les flux imposés, qui font partie des matrices.
+
+    Arguments:
+        ensemble (list[Bords]): Les conditions aux limites de chaque scénario.
+
+    Retourne:
+        Bords: Les conditions empilées.
+
+    Lève une erreur si les scénarios n'ont pas les mêmes bords à flux imposé.
+    """
+    premier = ensemble[0]
+    for bords in ensemble[1:]:
+        if (bords.forme != premier.forme or bords.flux != premier.flux
+                or [plan for plan, *_ in bords._dirichlet] != [plan for plan, *_ in premier._dirichlet]):
+            raise ValueError("Les scénarios d'un ensemble doivent avoir les mêmes types de bords et les mêmes flux.")
+
+    empile = copy.copy(premier)
+    empile.lots = (len(ensemble),)
+    empile._dirichlet = []
+    for k, (plan, _, _, plan_forme) in enumerate(premier._dirichlet):
+        faces = [bords._dirichlet[k] for bords in ensemble]
+        if not any(variable for _, _, variable, _ in faces):
+            # profils constants, un par scénario
+            valeur = np.stack([np.broadcast_to(profil, plan_forme) for _, profil, _, _ in faces])
+            empile._dirichlet.append((plan, valeur, False, plan_forme))
+        else:
+            # au moins un scénario varie dans le temps : on évalue chacun et on empile (instants, scénarios, ...)
+            def valeur(temps, k=k, faces=faces, plan_forme=plan_forme):
+                return np.stack([bords.Valeurs(temps)[k][1] if variable else
+                                 np.broadcast_to(profil, (len(temps),) + plan_forme)
+                                 for bords, (_, profil, variable, _) in zip(ensemble, faces)], axis=1)
+            empile._dirichlet.append((plan, valeur, True, plan_forme))
+    empile.fixes = not empile.flux and not any(variable for _, _, variable, _ in empile._dirichlet)
+    empile._initiales = empile.Valeurs(np.zeros(1))
+    return empile
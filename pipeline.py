@@ -0,0 +1,96 @@
+import queue
+import threading
+
+# marque de fin d'une file
+_FIN = object()
+
+
+class _Erreur:
+    """
+    Erreur survenue dans une étape, transmise par les files jusqu'au consommateur qui la relance.
+    """
+
+    def __init__(self, erreur):
+        self.erreur = erreur
+
+
+def etapes(source, fonctions=(), capacite=8, attente=0.1):
+    """
+    Fait tourner une chaîne de traitements en parallèle : la source est parcourue dans un fil d'exécution,
+    chaque fonction est appliquée dans le sien, et les étapes sont reliées par des files bornées.
+    Une étape qui prend de l'avance est bloquée dès que sa file est pleine, la mémoire reste donc bornée.
+    Le consommateur (le fil principal, qui peut par exemple piloter l'affichage) reçoit les résultats dans l'ordre.
+    Une erreur dans une étape est relancée chez le consommateur ; si celui-ci s'arrête avant la fin,
+    les étapes s'arrêtent aussi.
+
+    Arguments:
+        source (iterable): Les éléments à traiter, produits dans un fil d'exécution à part.
+        fonctions (list): Les traitements successifs, chacun appliqué à un élément dans son propre fil.
+        capacite (int): Le nombre maximal d'éléments en attente dans chaque file.
+        attente (float): Le délai (en s) au bout duquel une étape bloquée vérifie si elle doit s'arrêter.
+
+    Retourne:
+        generator: Les éléments traités par toutes les étapes.
+    """
+    arret = threading.Event()
+    files = [queue.Queue(capacite) for _ in range(len(fonctions) + 1)]
+
+    def deposer(file, element):
+        # attente par tranches, pour pouvoir s'arrêter si le consommateur abandonne
+        while not arret.is_set():
+            try:
+                file.put(element, timeout=attente)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def prendre(file):
+        while not arret.is_set():
+            try:
+                return file.get(timeout=attente)
+            except queue.Empty:
+                pass
+        return _FIN
+
+    def produire():
+        try:
+            for element in source:
+                if not deposer(files[0], element):
+                    return
+        except BaseException as erreur:
+            deposer(files[0], _Erreur(erreur))
+            return
+        deposer(files[0], _FIN)
+
+    def transformer(fonction, entree, sortie):
+        while True:
+            element = prendre(entree)
+            if element is _FIN or isinstance(element, _Erreur):
+                deposer(sortie, element)
+                return
+            try:
+                resultat = fonction(element)
+            except BaseException as erreur:
+                deposer(sortie, _Erreur(erreur))
+                return
+            if not deposer(sortie, resultat):
+                return
+
+    fils = [threading.Thread(target=produire, daemon=True)]
+    fils += [threading.Thread(target=transformer, args=(fonction, files[k], files[k + 1]), daemon=True)
+             for k, fonction in enumerate(fonctions)]
+    for fil in fils:
+        fil.start()
+    try:
+        while True:
+            element = files[-1].get()
+            if element is _FIN:
+                break
+            if isinstance(element, _Erreur):
+                raise element.erreur
+            yield element
+    finally:
+        arret.set()
+        for fil in fils:
+            fil.join()
@@ -0,0 +1,116 @@
+import time
+
+
+class Profil:
+    """
+    Mesure le temps passé dans chaque phase d'une simulation (assemblage des matrices, résolution,
+    conditions aux limites, couleurs, affichage...) et compte les opérations effectuées.
+    Des fonctions de rappel peuvent être appelées à chaque pas de temps.
+
+    Les phases sont chronométrées par tranches successives : on note l'instant de début avec
+    `time.perf_counter()`, puis `Mesurer` ajoute la durée écoulée à la phase et renvoie l'instant
+    courant, qui sert de début à la tranche suivante :
+
+        debut = time.perf_counter()
+        ...
+        debut = profil.Mesurer('resolution', debut)
+        ...
+        debut = profil.Mesurer('bords', debut)
+
+    Attributs:
+        durees (dict): Le temps total passé dans chaque phase (en s).
+        appels (dict): Le nombre de mesures de chaque phase.
+        compteurs (dict): Les compteurs d'opérations (pas de temps, images, éléments mis à jour...).
+        rappels (list): Les fonctions appelées à chaque pas de temps avec (n, temps écoulé en s).
+        debut (float): L'instant de création du profil (`time.perf_counter()`).
+    """
+
+    def __init__(self, rappels=()):
+        """
+        Initialise un profil vide.
+
+        Arguments:
+            rappels (list): Les fonctions appelées à chaque pas de temps avec l'indice du pas
+                            et le temps écoulé depuis la création du profil (en s).
+        """
+        self.durees = {}
+        self.appels = {}
+        self.compteurs = {}
+        self.rappels = list(rappels)
+        self.debut = time.perf_counter()
+
+    def Mesurer(self, phase, debut):
+        """
+        Ajoute à une phase la durée écoulée depuis `debut`.
+
+        Arguments:
+            phase (str): Le nom de la phase.
+            debut (float): L'instant de début de la tranche (`time.perf_counter()`).
+
+        Retourne:
+            float: L'instant courant, début de la tranche suivante.
+        """
+        maintenant = time.perf_counter()
+        self.durees[phase] = self.durees.get(phase, 0.0) + maintenant - debut
+        self.appels[phase] = self.appels.get(phase, 0) + 1
+        return maintenant
+
+    def Compter(self, nom, nombre=1):
+        """
+        Incrémente un compteur d'opérations.
+
+        Arguments:
+            nom (str): Le nom du compteur.
+            nombre (int): L'incrément.
+        """
+        self.compteurs[nom] = self.compteurs.get(nom, 0) + nombre
+
+    def Pas(self, n):
+        """
+        Signale un nouveau pas de temps : compte le pas et appelle les fonctions de rappel.
+
+        Arguments:
+            n (int): L'indice du pas de temps.
+        """
+        self.compteurs['pas'] = self.compteurs.get('pas', 0) + 1
+        if self.rappels:
+            ecoule = time.perf_counter() - self.debut
+            for rappel in self.rappels:
+                rappel(n, ecoule)
+
+    def Resume(self):
+        """
+        Renvoie les mesures sous forme de dictionnaire (par exemple pour les enregistrer en JSON).
+
+        Retourne:
+            dict: Pour chaque phase, la durée totale, le nombre d'appels et la durée moyenne,
+                  les compteurs et le temps écoulé depuis la création du profil.
+        """
+        return {
+            'phases': {phase: {'duree': duree, 'appels': self.appels[phase],
+                               'moyenne': duree / self.appels[phase]}
+                       for phase, duree in self.durees.items()},
+            'compteurs': dict(self.compteurs),
+            'ecoule': time.perf_counter() - self.debut,
+        }
+
+    def Rapport(self):
+        """
+        Met en forme les mesures : les phases de la plus coûteuse à la moins coûteuse,
+        puis les compteurs.
+
+        Retourne:
+            str: Le rapport.
+        """
+        resume = self.Resume()
+        total = sum(self.durees.values())
+        lignes = [f"{'phase':<16}{'durée (s)':>12}{'appels':>10}{'moyenne (µs)':>14}{'part':>8}"]
+        for phase, mesure in sorted(resume['phases'].items(), key=lambda element: -element[1]['duree']):
+            part = mesure['duree'] / total if total else 0
+            lignes.append(f"{phase:<16}{mesure['duree']:>12.4f}{mesure['appels']:>10}"
+                          f"{mesure['moyenne'] * 1e6:>14.1f}{part:>8.1%}")
+        lignes.append(f"{'total mesuré':<16}{total:>12.4f}")
+        lignes.append(f"{'écoulé':<16}{resume['ecoule']:>12.4f}")
+        for nom, nombre in resume['compteurs'].items():
+            lignes.append(f"{nom:<16}{nombre:>12}")
+        return '\n'.join(lignes)
@@ -1,85 +1,196 @@
-from vpython import *
+import collections
+import itertools
+import math
+import time
 import numpy as np
+import cache
+import limites
+import pipeline
+import profilage
+import stockage
 import utils
 
+# coûts mesurés des schémas, par (forme de la grille, schéma) : (préparation, coût d'un pas) en s
+_couts_mesures = {}
+
+# le plus petit pas du schéma adaptatif est dt/2^_PAS_MIN
+_PAS_MIN = 8
+
 class EquationChaleur:
     """
-    Classe pour résoudre l'équation de la chaleur en 1D ou 2D et simuler la diffusion.
-    Pour le cas 2D, on se placera dans le cas particulier d'une structure carrée (Nx = Ny et dx = dy).
+    Classe pour résoudre l'équation de la chaleur en 1D, 2D ou 3D et simuler la diffusion.
+    En 2D, la plaque peut être rectangulaire (longueur L et hauteur H, Nx et Ny points, pas dx et dy).
+    En 3D, le bloc a en plus une profondeur P (Nz points, pas dz) ; on en visualise un plan (`Coupe`).
 
     Attributs:
-        dimension (str): La dimension de l'équation ('1D' ou '2D').
-        materiaux (str): Le matériau de la barre.
+        dimension (str): La dimension de l'équation ('1D', '2D' ou '3D').
+        materiaux (str ou list): Le matériau de la barre, ou le matériau de chaque point de la grille.
+        D (float): La diffusivité thermique (la plus grande s'il y a plusieurs matériaux).
+        carte (numpy.ndarray): La diffusivité de chaque point (None pour un seul matériau).
         L (float): La longueur (et hauteur en 2D) de la barre.
         T (float): La température initiale en °C.
-        Tg (float): La température initiale sur la face gauche, en °C.
-                    Peut être une liste dans le cas 2D de deux éléments pour une température en triangle.
-        Td (float): La température initiale sur la face droite, en °C.
-                    Peut être une liste dans le cas 2D de deux éléments pour une température en triangle.
-        Tb (float): La température initiale sur la face basse, en °C.
-                    Peut être une liste dans le cas 2D de deux éléments pour une température en triangle.
-        Th (float): La température initiale sur la face haute, en °C.
-                    Peut être une liste dans le cas 2D de deux éléments pour une température en triangle.
+        Tg (float): La température sur la face gauche, en °C.
+                    Peut être une liste dans le cas 2D de deux éléments pour une température en triangle,
+                    une fonction du temps, ou une condition `limites.Neumann` ou `limites.Robin`.
+        Td (float): La température sur la face droite, en °C (mêmes possibilités que Tg).
+        Tb (float): La température sur la face basse, en °C (mêmes possibilités que Tg).
+        Th (float): La température sur la face haute, en °C (mêmes possibilités que Tg).
+        Tav (float): La température sur la face avant, en °C (3D seulement, mêmes possibilités que Tg).
+        Tar (float): La température sur la face arrière, en °C (3D seulement, mêmes possibilités que Tg).
+        bords (limites.Bords): Les conditions aux limites précalculées.
         duree (float): La durée de la simulation.
         Nt (int): Le nombre de pas de temps.
         Nx (int): Le nombre de pas d'espace.
+        H (float): La hauteur de la plaque ou du bloc (2D et 3D).
+        Ny (int): Le nombre de pas d'espace selon y (2D et 3D).
+        P (float): La profondeur du bloc (3D seulement).
+        Nz (int): Le nombre de pas d'espace selon z (3D seulement).
         dt (float): Le pas de temps.
-        dx (float): Le pas d'espace (x ou y).
-        r (float): Un coefficient.
+        dx (float): Le pas d'espace selon x.
+        dy (float): Le pas d'espace selon y (2D et 3D).
+        dz (float): Le pas d'espace selon z (3D seulement).
+        r (float): Un coefficient (D.dt/dx²).
+        ry (float): Le coefficient selon y (D.dt/dy², 2D et 3D).
+        rz (float): Le coefficient selon z (D.dt/dz², 3D seulement).
+        forme (tuple): La forme du tableau des températures ((Nx,), (Nx, Ny) ou (Nx, Ny, Nz)).
+        coefficients (tuple): Le coefficient de chaque axe ((r,), (r, ry) ou (r, ry, rz)).
         corps (list): Les éléments graphiques de la simulation.
-        centres (list): Les centres des éléments graphiques.
-        Tfs (list): Les températures pour chaque point de la barre à chaque instant.
-        vitesse (int): La vitesse de simulation (nombre de mise à jour par seconde).
+        centres (list): Les centres des éléments graphiques (selon x).
+        centres_y (list): Les centres des éléments graphiques selon y (2D et 3D).
+        centres_z (list): Les centres des points selon z (3D seulement).
+        pas_sortie (int): On conserve un instantané tous les `pas_sortie` pas de temps (et l'état final).
+        memoire (int): Nombre maximal d'instantanés conservés (les plus récents), None pour tous.
+        schema (str): Le schéma de résolution utilisé ('explicite', 'implicite', 'crank_nicolson', 'spectral'
+                      ou 'adaptatif').
+        erreur_locale (float): L'erreur locale maximale par pas du schéma adaptatif (en °C).
+        pas_adaptatifs (list[float]): Les pas de temps réalisés par le schéma adaptatif (en s), dans l'ordre.
+        rejets (int): Le nombre de pas refusés par le schéma adaptatif (erreur trop grande).
+        sous_pas (int): Nombre de sous-pas du schéma explicite par pas de temps (pour rester stable).
+        couts (dict): Les coûts estimés (en s) de chaque schéma envisagé lors du choix automatique.
+        raison (str): La raison du choix du schéma.
+        schema_demande (str): Le schéma imposé à l'initialisation (None pour un choix automatique).
+        tolerance (float): Variation par pas en dessous de laquelle on arrête la simulation (régime stationnaire),
+                           None pour aller jusqu'au bout.
+        norme (str): La mesure de la variation par pas : 'max' (écart maximal) ou 'L2' (écart quadratique moyen).
+        n_stationnaire (int): Le pas de temps où le régime stationnaire est atteint (None s'il ne l'est pas).
+        t_stationnaire (float): L'instant où le régime stationnaire est atteint (None s'il ne l'est pas).
+        profil (profilage.Profil): Les mesures du temps passé dans chaque phase (None si désactivées).
+        cache (str): Le dossier du cache des simulations terminées (None sans cache).
+        taille_cache (int): La taille maximale du cache en octets (None pour `cache.TAILLE_MAX`).
+        indices (numpy.ndarray): Les indices des pas de temps des instantanés conservés.
+        Tfs (numpy.ndarray): Les températures pour chaque point de la barre à chaque instant conservé
+                             (None si la simulation est calculée à la demande).
+        vitesse (int): La vitesse de simulation (nombre d'images affichées par seconde).
 
     Méthodes:
         EulerExplicite(): Résout l'équation de la chaleur en utilisant la méthode d'Euler explicite.
         EulerImplicite(): Résout l'équation de la chaleur en utilisant la méthode d'Euler implicite avec Crank-Nicholson.
+        ChoisirSchema(): Choisit le schéma stable le plus rapide.
+        Flux(): Produit les états successifs de la simulation à la demande, sans garder l'historique.
+        Ensemble(): Produit les états d'un ensemble de scénarios calculés ensemble (tableaux empilés).
+        Resoudre(): Résout l'équation en ne conservant que les instantanés demandés.
+        SolutionSpectrale(): Calcule directement les températures à des instants donnés (méthode spectrale).
+        Enregistrer(): Résout l'équation en écrivant les instantanés dans un fichier projeté en mémoire.
+        Charger(): Recrée une simulation à partir d'un historique enregistré, sans la recalculer.
+        Parametres(): Renvoie les paramètres de la simulation.
         ObtenirCouleur(): Calcule les couleurs correspondant aux températures pour chaque point de la simulation.
         CreerElement(): Crée la représentation graphique 3D de la barre ou de la plaque.
         Simuler(): Lance la simulation de la diffusion thermique, permet aussi de suivre l'évolution de la température en
                     un point donné de l'élément.
+        Sondes(): Renvoie l'évolution de la température en plusieurs points, sur tout l'historique.
+        Coupe(): Renvoie la partie d'un état que l'on visualise (un plan du bloc en 3D).
+        RapportProfil(): Met en forme les mesures par phase de la simulation.
     """
 
     def __init__(self,dimension: str, materiaux: str, L: float = 50, T: float = 20,
-                duree: float = 4, Nt: int = 1000, Nx: int = 40):
+                duree: float = 4, Nt: int = 1000, Nx: int = 40,
+                pas_sortie: int = None, memoire: int = None, differe: bool = False,
+                Tg=None, Td=None, Tb=None, Th=None, schema: str = None,
+                tolerance: float = None, norme: str = 'max', profil=None,
+                H: float = None, Ny: int = None, cache: str = None, taille_cache: int = None,
+                Tav=None, Tar=None, P: float = None, Nz: int = None, erreur_locale: float = 0.01):
         """
         Initialise la classe EquationChaleur.
 
         Arguments:
-            dimension (str): La dimension de l'équation ('1D' ou '2D').
-            materiaux (str): Le matériau de la barre.
+            dimension (str): La dimension de l'équation ('1D', '2D' ou '3D').
+            materiaux (str ou list): Le matériau de la barre, ou un tableau de noms de matériaux de la forme
+                                     de la grille ((Nx,), (Nx, Ny) ou (Nx, Ny, Nz)) pour un élément composite.
             L (float): La longueur de la barre.
             T (float): La température initiale.
             duree (float): La durée de la simulation.
             Nt (int): Le nombre de pas de temps.
             Nx (int): Le nombre de pas d'espace.
+            pas_sortie (int): On conserve un instantané tous les `pas_sortie` pas de temps (et l'état final).
+                              Par défaut 1, sauf en 3D où l'on ne conserve qu'une centaine d'instantanés.
+            memoire (int): Si donné, on ne conserve que les `memoire` derniers instantanés
+                           (1 pour ne garder que l'état final).
+            differe (bool): Si True, rien n'est calculé à l'initialisation, les états sont produits
+                            à la demande pendant la simulation.
+            Tg, Td, Tb, Th, Tav, Tar (float ou list[float]): Les conditions aux limites (Tb et Th seulement
+                            en 2D et 3D, Tav et Tar seulement en 3D).
+                            Si elles ne sont pas données, elles sont demandées à l'utilisateur.
+                            Une fonction du temps (qui reçoit le tableau des instants) donne une température
+                            variable, `limites.Neumann` un flux imposé et `limites.Robin` un échange convectif.
+            schema (str): Pour forcer le schéma ('explicite', 'implicite' ou 'spectral'),
+                          sinon le schéma stable le plus rapide est choisi. Le schéma 'crank_nicolson'
+                          (Crank-Nicholson couplé, résolu par gradient conjugué) et le schéma 'adaptatif'
+                          (Crank-Nicholson à pas de temps variable) ne sont utilisés que s'ils sont imposés.
+            tolerance (float): Si donnée, on arrête la simulation dès que la variation des températures
+                               en un pas est inférieure à `tolerance` (en °C) : le régime stationnaire est atteint.
+            norme (str): La mesure de la variation : 'max' (écart maximal) ou 'L2' (écart quadratique moyen).
+            profil (bool ou profilage.Profil): Si True (ou un profil existant, par exemple avec des fonctions
+                                               de rappel), on mesure le temps passé dans chaque phase.
+                                               Sans profil, les mesures ne coûtent rien.
+            H (float): La hauteur de la plaque en 2D ou du bloc en 3D (par défaut L).
+            Ny (int): Le nombre de pas d'espace selon y en 2D et 3D (par défaut Nx).
+            cache (str): Si donné, le dossier d'un cache des simulations terminées : une simulation déjà calculée
+                         avec les mêmes paramètres y est relue au lieu d'être recalculée (voir `cache`).
+            taille_cache (int): La taille maximale du cache en octets (par défaut `cache.TAILLE_MAX`) ; les simulations
+                                les moins récemment utilisées sont supprimées au-delà.
+            Tav, Tar: Voir Tg.
+            P (float): La profondeur du bloc en 3D (par défaut L).
+            Nz (int): Le nombre de pas d'espace selon z en 3D (par défaut Nx).
+            erreur_locale (float): Avec le schéma 'adaptatif', l'erreur locale maximale par pas (en °C) :
+                                   le pas de temps grandit tant qu'elle reste sous cette valeur.
         """
 
         self.dimension = dimension
         self.materiaux =materiaux
         # diffusivité thermique
-        self.D = utils.diffusivite_thermique_materiaux[self.materiaux]
+        if isinstance(self.materiaux, str):
+            self.D = utils.diffusivite_thermique_materiaux[self.materiaux]
+            self.carte = None
+        else:
+            # matériau de chaque point : la stabilité et le pas de temps se règlent sur la plus grande diffusivité
+            noms = np.asarray(self.materiaux, dtype=object)
+            self.carte = np.array([utils.diffusivite_thermique_materiaux[nom] for nom in noms.ravel()],
+                                  dtype=float).reshape(noms.shape)
+            self.D = self.carte.max()
 
         self.Nt = Nt
         self.Nx =Nx
 
         self.T = T
-        # nombre différents de conditions aux limites (Dirichlet) différents en 1D et 2D.
+        # nombre différents de conditions aux limites (Dirichlet) différents en 1D, 2D et 3D,
+        # demandées à l'utilisateur si elles ne sont pas données en arguments.
         if self.dimension == '1D':
-            self.Tg = input('Température à gauche (nombre décimal (en °C)) : ')
-            self.Td = input('Température à droite (nombre décimal (en °C)) : ')
-            # vitesse pour une simulation en 1D
-            self.vitesse = 1000
-        elif self.dimension == '2D':
-            self.Tb = eval(input('Température en bas (nombre décimal ou liste de deux éléments (en °C)) : '))
-            self.Th = eval(input('Température en haut (nombre décimal ou liste de deux éléments (en °C)) : '))
-            self.Tg = eval(input('Température à gauche (nombre décimal ou liste de deux éléments (en °C)) : '))
-            self.Td = eval(input('Température à droite (nombre décimal ou liste de deux éléments (en °C)) : '))
-            # vitesse pour une simulation en 2D
-            self.vitesse = 10000
+            self.Tg = input('Température à gauche (nombre décimal (en °C)) : ') if Tg is None else Tg
+            self.Td = input('Température à droite (nombre décimal (en °C)) : ') if Td is None else Td
+        elif self.dimension in ('2D', '3D'):
+            self.Tb = eval(input('Température en bas (nombre décimal ou liste de deux éléments (en °C)) : ')) if Tb is None else Tb
+            self.Th = eval(input('Température en haut (nombre décimal ou liste de deux éléments (en °C)) : ')) if Th is None else Th
+            self.Tg = eval(input('Température à gauche (nombre décimal ou liste de deux éléments (en °C)) : ')) if Tg is None else Tg
+            self.Td = eval(input('Température à droite (nombre décimal ou liste de deux éléments (en °C)) : ')) if Td is None else Td
+            if self.dimension == '3D':
+                self.Tav = eval(input('Température à l\'avant (nombre décimal ou liste de deux éléments (en °C)) : ')) if Tav is None else Tav
+                self.Tar = eval(input('Température à l\'arrière (nombre décimal ou liste de deux éléments (en °C)) : ')) if Tar is None else Tar
         else:
-            raise ValueError("`dimension` doit être `1D` ou `2D`.")
+            raise ValueError("`dimension` doit être `1D`, `2D` ou `3D`.")
         
+        # vitesse de la simulation (images par seconde)
+        self.vitesse = 25
+
         self.L = L
         self.e = 8
 
@@ -93,197 +204,1166 @@ class EquationChaleur:
         self.corps = []
         self.centres = [ - self.L/2 + i * self.dx + self.dx/2 for i in range(self.Nx)]
 
-        # températures finales on utilise la résolution stable la moins couteuse.
-        self.Tfs = self.EulerExplicite() if self.r < 0.5 else self.EulerImplicite()
+        if self.dimension == '1D':
+            self.forme = (self.Nx,)
+            self.coefficients = (self.r,)
+        else:
+            # plaque rectangulaire : hauteur, nombre de points et pas propres à l'axe y
+            self.H = self.L if H is None else H
+            self.Ny = self.Nx if Ny is None else Ny
+            self.dy = self.H / (self.Ny - 1)
+            self.ry = self.D * self.dt / self.dy ** 2
+            self.centres_y = [- self.H / 2 + j * self.dy + self.dy / 2 for j in range(self.Ny)]
+            self.forme = (self.Nx, self.Ny)
+            self.coefficients = (self.r, self.ry)
+        if self.dimension == '3D':
+            # bloc : profondeur, nombre de points et pas propres à l'axe z
+            self.P = self.L if P is None else P
+            self.Nz = self.Nx if Nz is None else Nz
+            self.dz = self.P / (self.Nz - 1)
+            self.rz = self.D * self.dt / self.dz ** 2
+            self.centres_z = [- self.P / 2 + k * self.dz + self.dz / 2 for k in range(self.Nz)]
+            self.forme = (self.Nx, self.Ny, self.Nz)
+            self.coefficients = (self.r, self.ry, self.rz)
 
-    def EulerExplicite(self):
+        if self.carte is not None:
+            if self.carte.shape != self.forme:
+                raise ValueError(f"La carte des matériaux doit avoir la forme de la grille {self.forme}.")
+            if self.carte.min() == self.D:
+                # un seul matériau
+                self.carte = None
+
+        # conditions aux limites précalculées
+        self.bords = self._Bords()
+
+        # en 3D, un instantané pèse Nx.Ny.Nz valeurs : on n'en conserve qu'une centaine par défaut
+        if pas_sortie is None:
+            pas_sortie = max(1, (self.Nt - 1) // 100) if self.dimension == '3D' else 1
+        self.pas_sortie = pas_sortie
+        self.memoire = memoire
+
+        # schéma adaptatif : précision demandée, pas réalisés et refusés
+        self.erreur_locale = erreur_locale
+        self.pas_adaptatifs = None
+        self.rejets = 0
+
+        # détection du régime stationnaire
+        self.tolerance = tolerance
+        self.norme = norme
+        self.n_stationnaire = None
+        self.t_stationnaire = None
+
+        # cache des simulations terminées
+        self.cache = cache
+        self.taille_cache = taille_cache
+
+        # mesures par phase (désactivées par défaut)
+        self.profil = profilage.Profil() if profil is True else profil or None
+
+        # on utilise la résolution stable la moins couteuse, sauf si un schéma est imposé.
+        self.schema_demande = schema
+        self.schema = None
+        # le schéma explicite est découpé en sous-pas pour rester stable, quel que soit le schéma choisi
+        self.sous_pas = self._StabiliteExplicite()[2]
+        self.couts = {}
+        if schema is None:
+            # avec un cache, les schémas ne sont mesurés que si la simulation n'y est pas déjà (voir `Resoudre`)
+            if differe or cache is None:
+                self.ChoisirSchema()
+        else:
+            self.schema = schema
+            self.raison = f"schéma {schema} imposé"
+        # températures conservées et indices des pas de temps correspondants
+        self.indices, self.Tfs = (None, None) if differe else self.Resoudre()
+
+    def ChoisirSchema(self):
         """
-        Résolution de l'équation de la chaleur en utilisant la méthode d'Euler explicite.
+        Choisit le schéma stable le plus rapide pour cette simulation.
+        Le schéma explicite n'est stable que si r <= 1/2 en 1D, r <= 1/4 en 2D et r <= 1/6 en 3D (moins avec un échange
+        convectif aux bords), sinon on le découpe en sous-pas. Le schéma spectral n'est envisagé
+        qu'avec des conditions de Dirichlet constantes. Le coût de chaque schéma est estimé à partir de quelques pas mesurés sur cette machine
+        pour cette grille (mesures gardées pour les simulations suivantes de même grille).
+        Met à jour `schema`, `sous_pas`, `couts` et `raison`.
+
+        Retourne:
+            str: Le schéma choisi.
         """
+        r, limite, sous_pas = self._StabiliteExplicite()
+        nombre_sorties = len(utils.indices_sortie(self.Nt, self.pas_sortie))
 
-        # en 1D
+        preparation, cout = self._MesurerCout('explicite')
+        self.couts = {'explicite': preparation + cout * sous_pas * (self.Nt - 1)}
+        preparation, cout = self._MesurerCout('implicite')
+        self.couts['implicite'] = preparation + cout * (self.Nt - 1)
+        # le schéma spectral ne calcule que les instants conservés
+        if self.bords.fixes and self.carte is None:
+            preparation, cout = self._MesurerCout('spectral')
+            self.couts['spectral'] = preparation + cout * (nombre_sorties - 1)
+
+        self.schema = min(self.couts, key=self.couts.get)
+        self.sous_pas = sous_pas
+
+        stabilite = (f"r = {r:.3g} <= {limite} : explicite stable" if sous_pas == 1 else
+                     f"r = {r:.3g} > {limite} : explicite stable avec {sous_pas} sous-pas")
+        couts = ", ".join(f"{schema} {cout:.3g} s" for schema, cout in self.couts.items())
+        self.raison = f"{stabilite} ; coûts estimés : {couts} ; le plus rapide est {self.schema}"
+        return self.schema
+
+    def _StabiliteExplicite(self):
+        """
+        Calcule le nombre de sous-pas pour que le schéma explicite soit stable (coefficient moyen des axes,
+        augmenté par les bords convectifs).
+
+        Retourne:
+            tuple (float, float, int): Le coefficient r, la limite de stabilité et le nombre de sous-pas.
+        """
+        limite = utils.limite_stabilite(self.dimension)
+        facteurs = self.bords.FacteursStabilite()
+        r = sum(c * f for c, f in zip(self.coefficients, facteurs)) / len(self.coefficients)
+        return r, limite, max(1, math.ceil(r / limite))
+
+    def _MesurerCout(self, schema, pas=3):
+        """
+        Mesure le coût d'un schéma sur cette grille en calculant quelques pas.
+
+        Arguments:
+            schema (str): Le schéma à mesurer.
+            pas (int): Le nombre de pas mesurés.
+
+        Retourne:
+            tuple (float, float): Le coût de la préparation et le coût d'un pas (sans sous-pas), en s.
+        """
+        # le coût dépend aussi de la diffusivité (uniforme ou variable), de la nature des bords
+        # (points fantômes, conditions évaluées dans le temps) et du nombre de scénarios
+        cle = (self.forme, schema, self.carte is not None, self.bords.Natures(), self.bords.lots)
+        if cle not in _couts_mesures:
+            pas = max(1, min(pas, self.Nt - 1))
+            # les pas d'essai ne font pas partie des mesures de la simulation
+            profil, self.profil = self.profil, None
+            # le schéma explicite est mesuré sur un seul sous-pas par pas
+            flux = self._FluxExplicite(sous_pas=1) if schema == 'explicite' else self.Flux(schema, pas_sortie=1)
+            debut = time.perf_counter()
+            # état initial et préparation (matrices, transformée...)
+            next(flux)
+            milieu = time.perf_counter()
+            for _ in range(pas):
+                next(flux, None)
+            fin = time.perf_counter()
+            flux.close()
+            self.profil = profil
+            _couts_mesures[cle] = (milieu - debut, (fin - milieu) / pas)
+        return _couts_mesures[cle]
+
+    def Flux(self, schema=None, pas_sortie=None, depart=None, bords=None):
+        """
+        Générateur des états successifs de la simulation, calculés à la demande sans garder l'historique.
+        Si une tolérance est donnée, le dernier état produit est celui où le régime stationnaire est atteint.
+
+        Arguments:
+            schema (str): 'explicite', 'implicite', 'crank_nicolson', 'spectral' ou 'adaptatif', par défaut le schéma
+                          choisi à l'initialisation. Les schémas spectral et adaptatif ne calculent que les états
+                          produits (le schéma adaptatif les interpole entre ses pas).
+            pas_sortie (int): On ne produit qu'un état tous les `pas_sortie` pas de temps (et l'état final),
+                              par défaut la valeur donnée à l'initialisation.
+            depart (tuple): Couple (n, T) pour reprendre la simulation à partir de l'état T au pas n,
+                            au lieu de l'état initial.
+            bords (limites.Bords): Les conditions aux limites, par défaut celles de la simulation
+                                   (voir `Ensemble`, le schéma spectral n'utilise que celles-ci).
+
+        Retourne:
+            generator: Des couples (n, T) avec n l'indice du pas de temps et T les températures.
+                       T est réutilisé par le solveur aux pas suivants, il faut le copier pour le conserver.
+        """
+        schema = self.schema if schema is None else schema
+        pas_sortie = self.pas_sortie if pas_sortie is None else pas_sortie
+
+        n0 = 0 if depart is None else depart[0]
+        if schema == 'explicite':
+            etats = enumerate(self._FluxExplicite(depart, bords), n0)
+        elif schema == 'implicite':
+            etats = enumerate(self._FluxImplicite(depart, bords), n0)
+        elif schema == 'crank_nicolson':
+            etats = enumerate(self._FluxCrankNicolson(depart, bords), n0)
+        elif schema == 'spectral':
+            # on saute directement d'un état produit au suivant
+            etats = self._FluxSpectral(utils.indices_sortie(self.Nt, pas_sortie), depart)
+        elif schema == 'adaptatif':
+            # pas de temps variables, états interpolés aux pas de temps produits
+            etats = self._FluxAdaptatif(utils.indices_sortie(self.Nt, pas_sortie), depart, bords)
+        else:
+            raise ValueError("`schema` doit être `explicite`, `implicite`, `crank_nicolson`, `spectral` ou `adaptatif`.")
+
+        self.n_stationnaire = self.t_stationnaire = None
+        profil = self.profil
+        precedent, n_precedent = None, n0
+        for n, T in etats:
+            if profil:
+                profil.Pas(n)
+            if self.tolerance is not None:
+                if profil:
+                    debut = time.perf_counter()
+                if precedent is None:
+                    precedent = T.copy()
+                # variation moyenne par pas depuis l'état précédent
+                elif utils.ecart(T, precedent, self.norme) / (n - n_precedent) < self.tolerance:
+                    # régime stationnaire atteint, on s'arrête là
+                    self.n_stationnaire, self.t_stationnaire = n, n * self.dt
+                    if profil:
+                        profil.Mesurer('stationnaire', debut)
+                    yield n, T
+                    return
+                else:
+                    np.copyto(precedent, T)
+                n_precedent = n
+                if profil:
+                    profil.Mesurer('stationnaire', debut)
+
+            if n % pas_sortie == 0 or n == self.Nt - 1:
+                yield n, T
+
+    def Ensemble(self, scenarios, schema=None, pas_sortie=None):
+        """
+        Générateur des états d'un ensemble de scénarios calculés ensemble, sur la même grille et avec les mêmes
+        matériaux, qui ne diffèrent que par la température initiale et les valeurs des conditions aux limites.
+        Les températures de tous les scénarios sont empilées dans un seul tableau, avancé d'un pas à la fois :
+        le schéma explicite et les matrices factorisées de Crank-Nicholson sont partagés, il n'y a pas de boucle
+        Python sur les scénarios. Avec une tolérance, on s'arrête quand tous ont atteint le régime stationnaire.
+
+        Arguments:
+            scenarios (list[dict]): Pour chaque scénario, les valeurs qui diffèrent de la simulation parmi
+                                    `T`, `Tg`, `Td` (et `Tb`, `Th` en 2D, `Tav`, `Tar` en 3D). Les bords à flux imposé
+                                    (Neumann, Robin) doivent être les mêmes pour tous.
+            schema (str): 'explicite', 'implicite' ou 'crank_nicolson', par défaut le schéma choisi
+                          à l'initialisation (Crank-Nicholson s'il s'agit du schéma spectral).
+            pas_sortie (int): On ne produit qu'un état tous les `pas_sortie` pas de temps (et l'état final).
+
+        Retourne:
+            generator: Des couples (n, T) avec T de forme (scénarios,) + forme de la grille,
+                       réutilisé par le solveur aux pas suivants.
+        """
+        schema = self.schema if schema is None else schema
+        if schema == 'spectral':
+            # la solution spectrale se calcule scénario par scénario, on partage plutôt la factorisation
+            schema = 'implicite'
+        bords = limites.empiler([self._Bords(scenario) for scenario in scenarios])
+        T = np.stack([np.zeros(self.forme) + scenario.get('T', self.T) for scenario in scenarios])
+        bords.Imposer(T)
+        return self.Flux(schema, pas_sortie, depart=(0, T), bords=bords)
+
+    def Resoudre(self, schema=None, pas_sortie=None, memoire=None):
+        """
+        Résout l'équation de la chaleur et conserve les instantanés demandés.
+        Avec un cache, une simulation déjà calculée avec les mêmes paramètres y est relue,
+        et une nouvelle simulation y est ajoutée.
+
+        Arguments:
+            schema (str): 'explicite', 'implicite', 'crank_nicolson', 'spectral' ou 'adaptatif', par défaut le schéma
+                          choisi à l'initialisation.
+            pas_sortie (int): On conserve un instantané tous les `pas_sortie` pas de temps (et l'état final).
+            memoire (int): Si donné, on ne conserve que les `memoire` derniers instantanés.
+
+        Retourne:
+            tuple (numpy.ndarray, numpy.ndarray): Les indices des pas de temps conservés
+                                                  et les températures correspondantes (un état par ligne).
+        """
+        pas_sortie = self.pas_sortie if pas_sortie is None else pas_sortie
+        memoire = self.memoire if memoire is None else memoire
+
+        cle = None
+        if self.cache is not None:
+            # la clé porte sur le schéma demandé ('auto' pour le choix automatique) : elle ne dépend pas
+            # des mesures de coût, qui peuvent départager différemment deux schémas de coûts voisins.
+            # Les conditions aux limites données par une fonction du temps ne sont pas mises en cache.
+            demande = schema if schema is not None else self.schema_demande or 'auto'
+            cle = cache.cle({'parametres': self.Parametres(), 'schema': demande,
+                             'pas_sortie': pas_sortie, 'memoire': memoire})
+            resultat = None if cle is None else cache.lire(self.cache, cle)
+            if resultat is not None:
+                indices, etats, metadonnees = resultat
+                self.n_stationnaire, self.t_stationnaire = metadonnees['n_stationnaire'], metadonnees['t_stationnaire']
+                if self.schema is None:
+                    # schéma choisi lors du premier calcul
+                    self.schema, self.sous_pas = metadonnees['schema'], metadonnees['sous_pas']
+                    self.raison = f"schéma {self.schema} relu dans le cache"
+                if 'pas_adaptatifs' in metadonnees:
+                    self.pas_adaptatifs, self.rejets = metadonnees['pas_adaptatifs'], metadonnees['rejets']
+                return indices, etats
+
+        if self.schema is None:
+            self.ChoisirSchema()
+        schema = self.schema if schema is None else schema
+        indices, etats = self._Conserver(schema, pas_sortie, memoire)
+        # une simulation instable (valeurs infinies ou NaN) n'est pas mise en cache
+        if cle is not None and np.isfinite(etats).all():
+            metadonnees = {'parametres': self.Parametres(), 'schema': schema, 'sous_pas': self.sous_pas,
+                           'pas_sortie': pas_sortie, 'memoire': memoire, 'version': cache.VERSION_SOLVEUR,
+                           'n_stationnaire': self.n_stationnaire, 't_stationnaire': self.t_stationnaire}
+            if schema == 'adaptatif':
+                metadonnees['pas_adaptatifs'], metadonnees['rejets'] = self.pas_adaptatifs, self.rejets
+            cache.ecrire(self.cache, cle, indices, etats, metadonnees,
+                         cache.TAILLE_MAX if self.taille_cache is None else self.taille_cache)
+        return indices, etats
+
+    def _Conserver(self, schema, pas_sortie, memoire):
+        """
+        Résout l'équation et conserve les instantanés demandés (voir `Resoudre`).
+        """
+        flux = self.Flux(schema, pas_sortie)
+
+        # on ne garde que les derniers instantanés dans un tampon circulaire
+        if memoire is not None:
+            derniers = collections.deque(((n, T.copy()) for n, T in flux), maxlen=memoire)
+            indices, etats = zip(*derniers)
+            return np.array(indices), np.array(etats)
+
+        # sinon on préalloue tout l'historique (il peut s'arrêter plus tôt en régime stationnaire)
+        indices = utils.indices_sortie(self.Nt, pas_sortie)
+        etats = None
+        for k, (n, T) in enumerate(flux):
+            if etats is None:
+                etats = np.empty((len(indices),) + T.shape)
+            etats[k] = T
+            indices[k] = n
+
+        return indices[:k + 1], etats[:k + 1]
+
+    def Enregistrer(self, chemin, pas_sortie=None, reprendre=False, frequence=100):
+        """
+        Résout l'équation en écrivant les instantanés au fur et à mesure dans un fichier `.npy`
+        projeté en mémoire (avec ses métadonnées dans un fichier `.json`), puis les utilise comme historique.
+        Une simulation interrompue peut être reprise à partir du dernier instantané écrit.
+
+        Arguments:
+            chemin (str): Le chemin du fichier `.npy` à écrire.
+            pas_sortie (int): On conserve un instantané tous les `pas_sortie` pas de temps (et l'état final).
+            reprendre (bool): Si True et que le fichier existe, on reprend la simulation au lieu de la recommencer.
+            frequence (int): Nombre d'instantanés entre deux points de reprise.
+        """
+        _, self.indices, self.Tfs = stockage.enregistrer(self, chemin, pas_sortie, reprendre, frequence)
+
+    @classmethod
+    def Charger(cls, chemin):
+        """
+        Recrée une simulation à partir d'un historique enregistré avec `Enregistrer`, sans rien recalculer.
+        Les instantanés sont lus directement dans le fichier quand on y accède.
+
+        Arguments:
+            chemin (str): Le chemin du fichier `.npy` de l'historique.
+
+        Retourne:
+            EquationChaleur: La simulation, prête à être analysée ou visualisée.
+        """
+        metadonnees, indices, Tfs = stockage.ouvrir(chemin)
+        equation = cls(**metadonnees['parametres'], pas_sortie=metadonnees['pas_sortie'], differe=True,
+                       schema=metadonnees['schema'])
+        equation.sous_pas = metadonnees['sous_pas']
+        equation.indices, equation.Tfs = indices, Tfs
+        # un historique complet qui s'arrête avant la fin a atteint le régime stationnaire
+        if metadonnees.get('termine') and len(indices) and indices[-1] < equation.Nt - 1:
+            equation.n_stationnaire = int(indices[-1])
+            equation.t_stationnaire = equation.n_stationnaire * equation.dt
+        return equation
+
+    def PreparerSondes(self, rapports):
+        """
+        Précalcule l'interpolation (linéaire en 1D, bilinéaire en 2D, trilinéaire en 3D) de plusieurs points
+        de la barre, de la plaque ou du bloc. Les points en dehors de la grille sont ramenés au bord.
+
+        Arguments:
+            rapports (float ou list): Les positions relatives des points : en 1D un rapport ou une liste
+                                      de rapports, en 2D un couple [rapport_x, rapport_y] ou une liste de couples,
+                                      en 3D un triplet [rapport_x, rapport_y, rapport_z] ou une liste de triplets.
+
+        Retourne:
+            tuple: Les indices et les poids d'interpolation (voir `utils.preparer_sondes`).
+        """
         if self.dimension == '1D':
-            # température initiale dans la barre
-            finale = [np.zeros(self.Nx) + self.T]
-            finale[0][0] = self.Tg
-            finale[0][-1] = self.Td
-
-            # à chaque instant
-            for _ in range(self.Nt - 1):
-                # températures dans la barre à l'instant d'avant
-                T_avant = finale[-1]
-                # initialisation pour températures à cet instant
-                T_mtn = np.zeros(self.Nx)
-                # on les calcule avec la formule
-                for i in range(1, self.Nx - 1):
-                    T_mtn[i] = T_avant[i] + self.r * (T_avant[i - 1] - 2 * T_avant[i] + T_avant[i + 1])
-                # on réinitialise les températures aux bords (car CL Dirichlet)
-                T_mtn[0] = self.Tg
-                T_mtn[-1] = self.Td
-                # on enregistre les températures pour cet instant et on passe à l'instant suivant
-                finale.append(T_mtn)
-        # en 2D
+            longueurs, centres = np.array([self.L]), [self.centres]
         elif self.dimension == '2D':
-            # températures initiales dans la plaque
-            finale = [np.zeros((self.Nx, self.Nx)) + self.T]
-            # conditions aux limites
-            finale[0][0, :] = np.linspace(self.Td[0], self.Td[1], self.Nx) if isinstance(self.Td, list) else self.Td
-            finale[0][-1, :] = np.linspace(self.Tg[0], self.Tg[1], self.Nx) if isinstance(self.Tg, list) else self.Tg
-            finale[0][:, 0] = np.linspace(self.Th[0], self.Th[1], self.Nx) if isinstance(self.Th, list) else self.Th
-            finale[0][:, 1] = np.linspace(self.Tb[0], self.Tb[1], self.Nx) if isinstance(self.Tb, list) else self.Tb
-
-            # à chaque instant
-            for _ in range(self.Nt - 1):
-                # températures dans la plaque à l'instant d'avant
-                T_avant = finale[-1]
-                # initialisation pour températures à cet instant
-                T_mtn = np.zeros_like(T_avant)
-                # on les calcule avec la formule
-                for i in range(1, self.Nx - 1):
-                    for j in range(1, self.Nx - 1):
-                        T_mtn[i, j] = (
-                            T_avant[i, j]
-                            + self.r * (T_avant[i - 1, j] - 2 * T_avant[i, j] + T_avant[i + 1, j])
-                            + self.r * (T_avant[i, j - 1] - 2 * T_avant[i, j] + T_avant[i, j + 1])
-                        )
-
-                # on réinitialise les températures aux bords (car CL Dirichlet)
-                T_mtn[0, :] = np.linspace(self.Td[0], self.Td[1], self.Nx) if isinstance(self.Td, list) else self.Td
-                T_mtn[-1, :] = np.linspace(self.Tg[0], self.Tg[1], self.Nx) if isinstance(self.Tg, list) else self.Tg
-                T_mtn[:, 0] = np.linspace(self.Th[0], self.Th[1], self.Nx) if isinstance(self.Th, list) else self.Th
-                T_mtn[:, -1] = np.linspace(self.Tb[0], self.Tb[1], self.Nx) if isinstance(self.Tb, list) else self.Tb
-                # on enregistre les températures pour cet instant et on passe à l'instant suivant
-                finale.append(T_mtn)
-
-        return finale
+            longueurs, centres = np.array([self.L, self.H]), [self.centres, self.centres_y]
+        else:
+            longueurs, centres = np.array([self.L, self.H, self.P]), [self.centres, self.centres_y, self.centres_z]
+        points = longueurs * np.reshape(np.asarray(rapports, dtype=float), (-1, len(longueurs))) - longueurs / 2
+        return utils.preparer_sondes(points, centres)
+
+    def Sondes(self, rapports):
+        """
+        Renvoie l'évolution de la température en plusieurs points, sur tout l'historique conservé
+        (ou sur les états produits à la demande), sans passer par l'affichage.
+
+        Arguments:
+            rapports (float ou list): Les positions relatives des points (voir `PreparerSondes`).
+
+        Retourne:
+            tuple (numpy.ndarray, numpy.ndarray): Les instants (en s) et les températures aux points
+                                                  (un instant par ligne, un point par colonne).
+        """
+        sondes = self.PreparerSondes(rapports)
+        if self.Tfs is not None:
+            # une seule lecture vectorisée sur tout l'historique
+            return np.asarray(self.indices) * self.dt, utils.interpoler_sondes(self.Tfs, sondes)
+
+        indices, temperatures = [], []
+        for n, T in self.Flux():
+            indices.append(n)
+            temperatures.append(utils.interpoler_sondes(T, sondes))
+        return np.array(indices) * self.dt, np.array(temperatures).reshape(len(indices), -1)
+
+    def RapportProfil(self):
+        """
+        Met en forme le temps passé dans chaque phase (assemblage des matrices, résolution, conditions
+        aux limites, couleurs, affichage...) et les compteurs d'opérations.
+
+        Retourne:
+            str: Le rapport.
+
+        Lève une erreur si les mesures n'ont pas été activées (argument `profil`).
+        """
+        if self.profil is None:
+            raise ValueError("Les mesures ne sont pas activées (argument `profil`).")
+        return self.profil.Rapport()
+
+    def Parametres(self):
+        """
+        Renvoie les paramètres de la simulation, tels qu'on les donne à l'initialisation.
+
+        Retourne:
+            dict: Les paramètres (dimension, matériau, dimensions, températures, durée, discrétisation,
+                  critère d'arrêt).
+        """
+        parametres = {
+            'dimension': self.dimension,
+            'materiaux': self.materiaux,
+            'L': self.L,
+            'T': self.T,
+            'duree': self.duree,
+            'Nt': self.Nt,
+            'Nx': self.Nx,
+            'Tg': self.Tg,
+            'Td': self.Td,
+            'tolerance': self.tolerance,
+            'norme': self.norme,
+        }
+        if self.dimension in ('2D', '3D'):
+            parametres['Tb'] = self.Tb
+            parametres['Th'] = self.Th
+            parametres['H'] = self.H
+            parametres['Ny'] = self.Ny
+        if self.schema == 'adaptatif':
+            parametres['erreur_locale'] = self.erreur_locale
+        if self.dimension == '3D':
+            parametres['Tav'] = self.Tav
+            parametres['Tar'] = self.Tar
+            parametres['P'] = self.P
+            parametres['Nz'] = self.Nz
+        return parametres
+
+    def EulerExplicite(self):
+        """
+        Résolution de l'équation de la chaleur en utilisant la méthode d'Euler explicite.
+
+        Retourne:
+            list: Les températures à chaque instant.
+        """
+        return [T.copy() for T in self._FluxExplicite()]
 
     def EulerImplicite(self):
         """
         Résout l'équation de la chaleur en utilisant la méthode d'Euler implicite.
         On utilise Crank-Nicholson pour plus de robustesse et de stabilité.
+
+        Retourne:
+            list: Les températures à chaque instant.
+        """
+        return [T.copy() for T in self._FluxImplicite()]
+
+    def _FluxExplicite(self, depart=None, bords=None, sous_pas=None):
+        """
+        Générateur des états du schéma d'Euler explicite.
+        Deux tampons alternent, aucun tableau n'est alloué à chaque pas. S'il y a des bords à flux imposé,
+        les tampons ont une couche de points fantômes, recalculés avant chaque sous-pas.
+
+        Arguments:
+            depart (tuple): Couple (n, T) pour reprendre à partir de l'état T au pas n.
+            bords (limites.Bords): Les conditions aux limites, par défaut celles de la simulation
+                                   (des conditions empilées pour calculer un ensemble de scénarios).
+            sous_pas (int): Le nombre de sous-pas par pas de temps, par défaut celui qui assure la stabilité
+                            (recalculé ici, quel que soit le schéma choisi à l'initialisation).
+        """
+        n0 = 0 if depart is None else depart[0]
+        bords = self.bords if bords is None else bords
+        sous_pas = self._StabiliteExplicite()[2] if sous_pas is None else sous_pas
+
+        # deux tampons (avec leurs points fantômes) et leurs vues sur la barre ou la plaque
+        (P_avant, T_avant), (P_mtn, T_mtn) = bords.Tampons()
+        # températures initiales, conditions aux limites comprises, ou état de reprise
+        T_avant[...] = self._EtatInitial() if depart is None else depart[1]
+        T_mtn[...] = T_avant
+        if self.carte is None:
+            # tampon de travail réutilisé à chaque instant
+            travail = np.empty_like(P_avant[(Ellipsis,) + (slice(1, -1),) * len(self.forme)])
+            pas = utils.pas_explicite
+        else:
+            # diffusivité variable : forme conservative, un coefficient par face (points fantômes compris)
+            travail = utils.tampons_flux(P_avant.shape[len(bords.lots):], bords.lots)
+            pas = utils.pas_explicite_variable
+        coefficients = self._Coefficients(marge=bool(bords.flux))
+        # coefficients de chaque sous-pas (un par axe)
+        r = tuple(coefficient / sous_pas for coefficient in coefficients)
+        # conditions de Dirichlet à chaque sous-pas, évaluées d'un coup
+        valeurs = bords.Valeurs(np.arange((self.Nt - 1) * sous_pas + 1) * self.dt / sous_pas)
+        profil = self.profil
+        yield T_avant
+
+        # à chaque instant
+        for n in range(n0, self.Nt - 1):
+            if profil:
+                debut = time.perf_counter()
+            for s in range(sous_pas):
+                # points fantômes des bords à flux imposé
+                bords.Fantomes(P_avant)
+                # on calcule les températures à cet instant avec la formule, sur tout l'élément d'un coup
+                pas(P_avant, r, P_mtn, travail)
+                if profil:
+                    debut = profil.Mesurer('resolution', debut)
+                # on réimpose les températures aux bords de Dirichlet
+                bords.Imposer(T_mtn, valeurs, n * sous_pas + s + 1)
+                if profil:
+                    debut = profil.Mesurer('bords', debut)
+                # on passe à l'instant suivant en échangeant les tampons
+                P_avant, P_mtn = P_mtn, P_avant
+                T_avant, T_mtn = T_mtn, T_avant
+            if profil:
+                profil.Compter('sous_pas', sous_pas)
+            yield T_avant
+
+    def _FluxImplicite(self, depart=None, bords=None):
+        """
+        Générateur des états du schéma de Crank-Nicholson (ADI en 2D et en 3D, voir `_PasImplicite`).
+
+        Arguments:
+            depart (tuple): Couple (n, T) pour reprendre à partir de l'état T au pas n.
+            bords (limites.Bords): Les conditions aux limites, par défaut celles de la simulation
+                                   (des conditions empilées pour calculer un ensemble de scénarios).
         """
+        n0 = 0 if depart is None else depart[0]
+        bords = self.bords if bords is None else bords
+
+        # températures initiales, conditions aux limites comprises, ou état de reprise
+        T_mtn = self._EtatInitial() if depart is None else np.array(depart[1], dtype=float)
+        profil = self.profil
+        if profil:
+            debut = time.perf_counter()
+        # matrices de l'équation (factorisées une seule fois pour toute la simulation), avant l'état initial
+        # comme pour les autres schémas : la préparation n'est pas comptée dans le coût des pas (`_MesurerCout`)
+        avancer = self._PasImplicite(self._Coefficients(), bords)
+        # conditions de Dirichlet à chaque demi-pas, évaluées d'un coup
+        valeurs = bords.Valeurs(np.arange(2 * self.Nt - 1) * self.dt / 2)
+        if profil:
+            profil.Mesurer('assemblage', debut)
+        yield T_mtn
+
+        # à chaque instant
+        for n in range(n0, self.Nt - 1):
+            T_mtn = avancer(T_mtn, valeurs, n)
+            yield T_mtn
+
+    def _PasImplicite(self, coefficients, bords):
+        """
+        Prépare un pas du schéma de Crank-Nicholson : les matrices sont construites et factorisées
+        une seule fois, le pas peut ensuite être répété autant qu'on veut.
+        En 2D, c'est un pas ADI de Peaceman-Rachford (deux demi-pas), en 3D un pas ADI de Douglas.
+
+        Arguments:
+            coefficients (tuple): Le coefficient de chaque axe pour la durée du pas (voir `_Coefficients`).
+            bords (limites.Bords): Les conditions aux limites.
+
+        Retourne:
+            function: avancer(T, valeurs, k), qui renvoie les températures un pas après T (dans un nouveau tableau),
+                      `valeurs` étant les conditions de Dirichlet évaluées à chaque demi-pas (`Bords.Valeurs`)
+                      et k l'indice du pas (les valeurs utilisées sont celles d'indices 2k + 1 et 2k + 2).
+        """
+        profil = self.profil
 
         # en 1D
         if self.dimension == '1D':
-            # température initiale dans la barre
-            finale = [np.zeros(self.Nx) + self.T]
-            # conditions aux limites
-            finale[0][0] = self.Tg
-            finale[0][-1] = self.Td
-
-            # matrices de l'équation
-            A = utils.matrice_tridiagonale(self.Nx, 1 + self.r, -self.r/ 2)
-            M = utils.matrice_tridiagonale(self.Nx, 1 - self.r, self.r/ 2)
-            A[0][0], A[self.Nx-1][self.Nx-1] = 1, 1
-            A[0][1], A[self.Nx-1][self.Nx-2] = 0, 0
-            M[0][0], M[self.Nx-1][self.Nx-1] = 1, 1
-            M[0][1], M[self.Nx-1][self.Nx-2] = 0, 0
-
-            # à chaque instant
-            for _ in range(self.Nt - 1):
+            # matrices de l'équation (A factorisée une seule fois)
+            A, M = self._MatricesCrankNicolson(0, self.Nx, coefficients[0])
+            # terme constant des bords à flux imposé (r/2 de chaque côté du schéma)
+            source = bords.Source(coefficients)
+
+            def avancer(T_mtn, valeurs, k):
+                if profil:
+                    debut = time.perf_counter()
                 # on résout l'équation matricielle pour avoir les températures
-                B = np.dot(M, finale[-1])
-                # on enregistre 
-                finale.append(utils.resoudre_equation_matricielle(A, B))
-                # on réinitialise les conditions aux limites (car CL Dirichlet) et on passe à l'instant suivant
-                finale[-1][0] = self.Tg
-                finale[-1][-1] = self.Td
-        
+                B = utils.produit_tridiagonal(M, T_mtn, axe=-1)
+                if source is not None:
+                    B += source
+                if profil:
+                    debut = profil.Mesurer('resolution', debut)
+                # aux bords de Dirichlet, le second membre est la valeur à l'instant suivant
+                bords.Imposer(B, valeurs, 2 * k + 2)
+                if profil:
+                    debut = profil.Mesurer('bords', debut)
+                T_mtn = utils.resoudre_tridiagonale(A, B, axe=-1)
+                if profil:
+                    debut = profil.Mesurer('resolution', debut)
+                # on réinitialise les conditions aux limites et on passe à l'instant suivant
+                bords.Imposer(T_mtn, valeurs, 2 * k + 2)
+                if profil:
+                    profil.Mesurer('bords', debut)
+                    profil.Compter('resolutions')
+                return T_mtn
+
         # en 2D
         elif self.dimension == '2D':
-            # températures initiales dans la plaque
-            finale = [np.zeros((self.Nx, self.Nx)) + self.T]
-            # conditions aux limites
-            finale[0][0, :] = np.linspace(self.Td[0], self.Td[1], self.Nx) if isinstance(self.Td, list) else self.Td
-            finale[0][-1, :] = np.linspace(self.Tg[0], self.Tg[1], self.Nx) if isinstance(self.Tg, list) else self.Tg
-            finale[0][:, 0] = np.linspace(self.Th[0], self.Th[1], self.Nx) if isinstance(self.Th, list) else self.Th
-            finale[0][:, -1] = np.linspace(self.Tb[0], self.Tb[1], self.Nx) if isinstance(self.Tb, list) else self.Tb
-
-            # matrices de l'équation
-            A = utils.matrice_tridiagonale(self.Nx, 2 + 2 * self.r, -self.r)
-            M = utils.matrice_tridiagonale(self.Nx, 2 - 2 * self.r, self.r)
-
-            # à chaque instant
-            for _ in range(self.Nt - 1):
-                # températures en x
-                T_col = np.zeros((self.Nx, self.Nx))
-                # on résout
-                for j in range(self.Nx):
-                    B = np.dot(M, finale[-1][:, j])
-                    T_col[:, j] = utils.resoudre_equation_matricielle(A, B)
-                # températures en y
-                T_ligne = np.zeros((self.Nx, self.Nx))
-                # on résous
-                for i in range(self.Nx):
-                    B = np.dot(M, T_col[i, :])
-                    T_ligne[i, :] = utils.resoudre_equation_matricielle(A, B)
-
-                # on réinitialise les températures aux bords (car CL Dirichlet)
-                T_ligne[0, :] = np.linspace(self.Td[0], self.Td[1], self.Nx) if isinstance(self.Td, list) else self.Td
-                T_ligne[-1, :] = np.linspace(self.Tg[0], self.Tg[1], self.Nx) if isinstance(self.Tg, list) else self.Tg
-                T_ligne[:, 0] = np.linspace(self.Th[0], self.Th[1], self.Nx) if isinstance(self.Th, list) else self.Th
-                T_ligne[:, -1] = np.linspace(self.Tb[0], self.Tb[1], self.Nx) if isinstance(self.Tb, list) else self.Tb
-
-                # on enregistre et on passe à l'instant suivant
-                finale.append(T_ligne)
-
-
-        return finale
+            # matrices d'un demi-pas ADI (Peaceman-Rachford) selon chaque axe : chaque demi-pas est implicite
+            # dans une direction et explicite dans l'autre, avec r/2 de chaque côté
+            Ax, Mx = self._MatricesCrankNicolson(0, self.Nx, coefficients[0])
+            Ay, My = self._MatricesCrankNicolson(1, self.Ny, coefficients[1])
+            # terme constant des bords à flux imposé, réparti sur les deux demi-pas
+            source = bords.Source(tuple(coefficient / 2 for coefficient in coefficients))
+
+            def avancer(T_mtn, valeurs, k):
+                if profil:
+                    debut = time.perf_counter()
+                # premier demi-pas : explicite en y sur toutes les lignes, puis implicite en x sur toutes
+                # les colonnes à la fois
+                B = utils.produit_tridiagonal(My, T_mtn, axe=-1)
+                if source is not None:
+                    B += source
+                if profil:
+                    debut = profil.Mesurer('resolution', debut)
+                # les valeurs aux bords de l'état intermédiaire sont celles des CL
+                bords.Imposer(B, valeurs, 2 * k + 1)
+                if profil:
+                    debut = profil.Mesurer('bords', debut)
+                T_demi = utils.resoudre_tridiagonale(Ax, B, axe=-2)
+                if profil:
+                    debut = profil.Mesurer('resolution', debut)
+                bords.Imposer(T_demi, valeurs, 2 * k + 1)
+                if profil:
+                    debut = profil.Mesurer('bords', debut)
+
+                # second demi-pas : explicite en x sur toutes les colonnes, puis implicite en y sur toutes
+                # les lignes à la fois
+                B = utils.produit_tridiagonal(Mx, T_demi, axe=-2)
+                if source is not None:
+                    B += source
+                if profil:
+                    debut = profil.Mesurer('resolution', debut)
+                bords.Imposer(B, valeurs, 2 * k + 2)
+                if profil:
+                    debut = profil.Mesurer('bords', debut)
+                T_mtn = utils.resoudre_tridiagonale(Ay, B, axe=-1)
+                if profil:
+                    debut = profil.Mesurer('resolution', debut)
+                # on réinitialise les températures aux bords de Dirichlet
+                bords.Imposer(T_mtn, valeurs, 2 * k + 2)
+                if profil:
+                    profil.Mesurer('bords', debut)
+                    profil.Compter('resolutions', 2)
+                return T_mtn
+
+        # en 3D
+        else:
+            # schéma ADI de Douglas : Peaceman-Rachford ne se généralise pas à trois axes en restant stable,
+            # on fait plutôt un pas de Crank-Nicholson complet implicite en x, puis deux corrections implicites
+            # en y et en z. Chaque étape est une résolution tridiagonale sur toutes les lignes de l'axe à la fois.
+            A, M = zip(*(self._MatricesCrankNicolson(axe, n, coefficients[axe])
+                         for axe, n in enumerate(self.forme)))
+            # terme constant des bords à flux imposé, entièrement dans la première étape
+            source = bords.Source(coefficients)
+            # axes d'espace (les derniers, les premiers éventuels séparent des scénarios)
+            axes = (-3, -2, -1)
+            # contributions de chaque axe, tableau de travail et tableaux des deux premières résolutions
+            # (l'axe résolu en premier), alloués une seule fois : seul l'état renvoyé est un nouveau tableau à chaque pas
+            forme = bords.lots + self.forme
+            E = [np.empty(forme) for _ in range(3)]
+            travail = np.empty(forme)
+            etapes = [np.empty(np.moveaxis(travail, axes[axe], 0).shape) for axe in range(2)] + [None]
+
+            def avancer(T_mtn, valeurs, k):
+                if profil:
+                    debut = time.perf_counter()
+                # contribution explicite (r/2) L T de chaque axe, M = I + (r/2) L
+                for axe in range(3):
+                    utils.produit_tridiagonal(M[axe], T_mtn, axe=axes[axe], sortie=E[axe], travail=travail)
+                    E[axe] -= T_mtn
+                # première étape : (I - (rx/2) Lx) T* = (I + (rx/2) Lx + ry Ly + rz Lz) T
+                # (les tableaux des contributions servent ensuite de seconds membres)
+                B = np.add(T_mtn, E[0], out=E[0])
+                B += np.multiply(E[1], 2, out=travail)
+                B += np.multiply(E[2], 2, out=travail)
+                if source is not None:
+                    B += source
+                T_etape = T_mtn
+                for axe in range(3):
+                    # étapes suivantes : (I - (r/2) L) T** = T* - (r/2) L T selon l'axe
+                    if axe > 0:
+                        B = np.subtract(T_etape, E[axe], out=E[axe])
+                    if profil:
+                        debut = profil.Mesurer('resolution', debut)
+                    # les valeurs aux bords des états intermédiaires sont celles des CL
+                    bords.Imposer(B, valeurs, 2 * k + 2)
+                    if profil:
+                        debut = profil.Mesurer('bords', debut)
+                    T_etape = utils.resoudre_tridiagonale(A[axe], B, axe=axes[axe], travail=etapes[axe])
+                if profil:
+                    debut = profil.Mesurer('resolution', debut)
+                # on réinitialise les températures aux bords de Dirichlet
+                bords.Imposer(T_etape, valeurs, 2 * k + 2)
+                if profil:
+                    profil.Mesurer('bords', debut)
+                    profil.Compter('resolutions', 3)
+                return T_etape
+
+        return avancer
+
+    def _FluxAdaptatif(self, indices, depart=None, bords=None):
+        """
+        Générateur des états du schéma de Crank-Nicholson (ADI en 2D et 3D) à pas de temps adaptatif.
+        Chaque pas h est comparé à deux demi-pas : leur écart estime l'erreur locale. Le pas est refusé
+        et divisé par deux si elle dépasse `erreur_locale`, et doublé si elle est assez petite.
+        Les pas valent toujours dt.2^k : les matrices factorisées de chaque pas sont gardées et réutilisées
+        à chaque fois que ce pas revient. Les états sont interpolés aux pas de temps demandés (parabole passant
+        par les états du début, du milieu et de la fin du pas), la suite des états produits reste donc régulière. Les pas réalisés sont notés dans `pas_adaptatifs`.
+
+        Arguments:
+            indices (list[int]): Les indices des pas de temps à produire, croissants.
+            depart (tuple): Couple (n, T) pour reprendre à partir de l'état T au pas n.
+            bords (limites.Bords): Les conditions aux limites, par défaut celles de la simulation.
+        """
+        bords = self.bords if bords is None else bords
+        n0, T_mtn = (0, self._EtatInitial()) if depart is None else (depart[0], np.array(depart[1], dtype=float))
+        profil = self.profil
+        coefficients = self._Coefficients()
+
+        # exposants des pas : de dt/2^PAS_MIN à la durée de la simulation. Le temps est compté en unités
+        # du plus petit pas, sans erreur d'arrondi.
+        k_min, k_max = -_PAS_MIN, max(0, int(math.log2(max(1, self.Nt - 1))))
+        unite = 2 ** _PAS_MIN
+        position, fin = n0 * unite, (self.Nt - 1) * unite
+        # un pas préparé (matrices factorisées) par exposant
+        pas = {}
+
+        def preparer(k):
+            if k not in pas:
+                if profil:
+                    debut = time.perf_counter()
+                pas[k] = self._PasImplicite(tuple(coefficient * 2.0 ** k for coefficient in coefficients), bords)
+                if profil:
+                    profil.Mesurer('assemblage', debut)
+            return pas[k]
+
+        self.pas_adaptatifs, self.rejets = [], 0
+        sorties = [n for n in indices if n >= n0]
+        if sorties and sorties[0] == n0:
+            yield n0, T_mtn
+            sorties.pop(0)
+        sorties = collections.deque(sorties)
+        k = 0
+        while sorties:
+            # le pas ne dépasse pas la fin de la simulation
+            while k > k_min and position + 2 ** (k - k_min) > fin:
+                k -= 1
+            h = 2.0 ** k * self.dt
+            t = position * self.dt / unite
+            # un pas h, et deux demi-pas (conditions de Dirichlet aux demi-pas et aux quarts de pas)
+            T_grand = preparer(k)(T_mtn, bords.Valeurs(t + np.arange(3) * h / 2), 0)
+            demi, valeurs = preparer(k - 1), bords.Valeurs(t + np.arange(5) * h / 4)
+            T_milieu = demi(T_mtn, valeurs, 0)
+            T_suivant = demi(T_milieu, valeurs, 1)
+            # estimation de l'erreur locale (Richardson, schéma d'ordre 2)
+            erreur = utils.ecart(T_suivant, T_grand) / 3
+            if erreur > self.erreur_locale and k > k_min:
+                self.rejets += 1
+                if profil:
+                    profil.Compter('rejets')
+                k -= 1
+                continue
+
+            suivante = position + 2 ** (k - k_min)
+            # états aux pas de temps demandés pendant ce pas, interpolés par la parabole qui passe par les états
+            # du début, du milieu et de la fin du pas
+            while sorties and sorties[0] * unite <= suivante:
+                n = sorties.popleft()
+                s = (n * unite - position) / (suivante - position)
+                if s == 1:
+                    yield n, T_suivant
+                else:
+                    yield n, (2 * (s - 0.5) * (s - 1) * T_mtn - 4 * s * (s - 1) * T_milieu
+                              + 2 * s * (s - 0.5) * T_suivant)
+            self.pas_adaptatifs.append(h)
+            T_mtn, position = T_suivant, suivante
+            if profil:
+                profil.Compter('pas_adaptatifs')
+            # erreur en h^3 : on double le pas si elle reste sous la limite
+            if erreur * 8 <= self.erreur_locale and k < k_max:
+                k += 1
+
+    def _MatricesCrankNicolson(self, axe, n, r):
+        """
+        Construit les matrices tridiagonales de Crank-Nicholson selon un axe : A = I - (r/2) L, factorisée,
+        et M = I + (r/2) L. Les lignes des bords sont l'identité pour un bord de Dirichlet, sinon
+        celles du laplacien avec un point fantôme (flux imposé).
+
+        Arguments:
+            axe (int): L'axe.
+            n (int): Le nombre de points selon l'axe.
+            r (float ou numpy.ndarray): Le coefficient de l'axe, ou celui de chaque face (diffusivité variable).
+
+        Retourne:
+            tuple: La factorisation de A et les trois diagonales de M.
+        """
+        # on ne stocke que les trois diagonales
+        if np.ndim(r):
+            # diffusivité variable : L relie chaque point à ses voisins par le coefficient de leur face commune,
+            # avec une matrice par ligne de l'autre axe
+            faces = np.moveaxis(r, axe, 0)
+            somme = np.zeros((n,) + faces.shape[1:])
+            somme[:-1] += faces
+            somme[1:] += faces
+            A = (-faces / 2, 1 + somme / 2, -faces / 2)
+            M = (faces / 2, 1 - somme / 2, faces / 2)
+        else:
+            A = utils.diagonales_tridiagonales(n, 1 + r, -r / 2)
+            M = utils.diagonales_tridiagonales(n, 1 - r, r / 2)
+        (A_inf, A_diag, A_sup), (M_inf, M_diag, M_sup) = A, M
+        for cote, ligne in zip((0, -1), self.bords.Lignes(axe, r)):
+            # couplage de la ligne du bord avec son voisin
+            A_couplage, M_couplage = (A_sup, M_sup) if cote == 0 else (A_inf, M_inf)
+            if ligne is None:
+                # bord de Dirichlet : identité
+                A_diag[cote], M_diag[cote] = 1, 1
+                A_couplage[cote], M_couplage[cote] = 0, 0
+            else:
+                A_diag[cote], A_couplage[cote], M_diag[cote] = ligne
+                M_couplage[cote] = -A_couplage[cote]
+        return utils.factoriser_tridiagonale(A), M
+
+    def _FluxCrankNicolson(self, depart=None, bords=None):
+        """
+        Générateur des états du schéma de Crank-Nicholson couplé (sans découpage par direction en 2D) :
+        à chaque pas on résout (I - L/2) T_suivant = (I + L/2) T sur toutes les inconnues à la fois
+        (les points intérieurs et les bords à flux imposé).
+        La matrice creuse n'est jamais formée, on ne garde que ses diagonales, et le système est résolu
+        par gradient conjugué préconditionné, en partant de l'état précédent.
+
+        Arguments:
+            depart (tuple): Couple (n, T) pour reprendre à partir de l'état T au pas n.
+            bords (limites.Bords): Les conditions aux limites, par défaut celles de la simulation
+                                   (des conditions empilées pour calculer un ensemble de scénarios).
+        """
+        n0 = 0 if depart is None else depart[0]
+        bords = self.bords if bords is None else bords
+
+        # deux tampons (avec leurs points fantômes) et leurs vues sur la barre ou la plaque
+        (P_mtn, T_mtn), (P_suivant, T_suivant), (P_second, B) = bords.Tampons(3)
+        T_mtn[...] = self._EtatInitial() if depart is None else depart[1]
+        T_suivant[...] = T_mtn
+        profil = self.profil
+        if profil:
+            debut = time.perf_counter()
+        region = bords.Region()
+        demi = tuple(coefficient / 2 for coefficient in self._Coefficients())
+        # matrice I - L/2 sur les inconnues, et poids de ses lignes
+        operateur, poids = bords.OperateurImplicite(demi)
+        # les inconnues de chaque scénario (les premiers axes éventuels séparent les scénarios)
+        region = (Ellipsis,) + region
+        # terme constant des bords à flux imposé, côté implicite
+        source = bords.Source(demi)
+        # conditions de Dirichlet à chaque instant, évaluées d'un coup
+        valeurs = bords.Valeurs(np.arange(self.Nt) * self.dt)
+        # contribution des bords de Dirichlet au côté implicite : L/2 appliqué aux seuls bords
+        # (une fois pour toutes si elles sont constantes)
+        (P_bords, T_bords), (P_apport, T_apport) = bords.Tampons()
+        apport = None
+        if self.carte is None:
+            travail = np.empty_like(P_mtn[(Ellipsis,) + (slice(1, -1),) * len(self.forme)])
+            pas, demi_tampons = utils.pas_explicite, demi
+        else:
+            # diffusivité variable : coefficients des faces sur les tampons (points fantômes compris)
+            travail = utils.tampons_flux(P_mtn.shape[len(bords.lots):], bords.lots)
+            pas = utils.pas_explicite_variable
+            demi_tampons = tuple(coefficient / 2 for coefficient in self._Coefficients(marge=bool(bords.flux)))
+        if profil:
+            profil.Mesurer('assemblage', debut)
+        yield T_mtn
+
+        # à chaque instant
+        for n in range(n0, self.Nt - 1):
+            if profil:
+                debut = time.perf_counter()
+            if apport is None or not bords.fixes:
+                bords.Imposer(T_bords, valeurs, n + 1)
+                pas(P_bords, demi_tampons, P_apport, travail)
+                apport = T_apport[region]
+            # second membre : (I + L/2) T plus les contributions des bords
+            bords.Fantomes(P_mtn)
+            pas(P_mtn, demi_tampons, P_second, travail)
+            second_membre = B[region]
+            second_membre += apport
+            if source is not None:
+                second_membre += source[region]
+            if poids is not None:
+                second_membre *= poids
+            # on part de l'état précédent
+            X = T_suivant[region]
+            X[...] = T_mtn[region]
+            iterations = utils.gradient_conjugue(operateur, second_membre, X)
+            if profil:
+                debut = profil.Mesurer('resolution', debut)
+                profil.Compter('resolutions')
+                profil.Compter('iterations', iterations)
+            bords.Imposer(T_suivant, valeurs, n + 1)
+            if profil:
+                profil.Mesurer('bords', debut)
+            # on passe à l'instant suivant en échangeant les tampons
+            P_mtn, P_suivant = P_suivant, P_mtn
+            T_mtn, T_suivant = T_suivant, T_mtn
+            yield T_mtn
+
+    def SolutionSpectrale(self, temps):
+        """
+        Calcule directement les températures aux instants demandés, sans avancer pas à pas dans le temps :
+        la solution exacte des différences finies en espace est l'état stationnaire plus une série
+        de sinus (transformée en sinus discrète, en O(N log N) par instant). Il n'y a pas de condition
+        de stabilité sur le pas de temps.
+
+        Arguments:
+            temps (list[float]): Les instants (en s) auxquels calculer les températures.
+
+        Retourne:
+            numpy.ndarray: Les températures à chaque instant demandé (un état par ligne).
+        """
+        self._VerifierSpectral()
+        preparation = utils.preparer_spectral(self._EtatInitial(), self.D, self._PasEspace())
+        return np.array([utils.etat_spectral(preparation, t) for t in temps])
+
+    def _FluxSpectral(self, indices, depart=None):
+        """
+        Générateur des états de la méthode spectrale, calculés seulement aux pas de temps demandés.
+
+        Arguments:
+            indices (list[int]): Les indices des pas de temps à produire, croissants.
+            depart (tuple): Couple (n, T) pour reprendre à partir de l'état T au pas n.
+        """
+        self._VerifierSpectral()
+        profil = self.profil
+        if profil:
+            debut = time.perf_counter()
+        n0, T0 = (0, self._EtatInitial()) if depart is None else depart
+        preparation = utils.preparer_spectral(T0, self.D, self._PasEspace())
+        if profil:
+            profil.Mesurer('assemblage', debut)
+        for n in indices:
+            if n >= n0:
+                if profil:
+                    debut = time.perf_counter()
+                T = utils.etat_spectral(preparation, (n - n0) * self.dt)
+                if profil:
+                    profil.Mesurer('resolution', debut)
+                yield n, T
+
+    def _VerifierSpectral(self):
+        """
+        Vérifie que la méthode spectrale s'applique : elle suppose des conditions de Dirichlet constantes
+        et un seul matériau.
+        """
+        if not self.bords.fixes:
+            raise ValueError("La méthode spectrale demande des conditions de Dirichlet constantes dans le temps.")
+        if self.carte is not None:
+            raise ValueError("La méthode spectrale demande une diffusivité uniforme (un seul matériau).")
+
+    def _Coefficients(self, marge=False):
+        """
+        Renvoie le coefficient de chaque axe ((r,), (r, ry) ou (r, ry, rz)), ou, s'il y a plusieurs matériaux, le coefficient
+        D.dt/d² de chaque face entre deux points voisins, la diffusivité d'une face étant la moyenne harmonique
+        de celles de ses deux points.
+
+        Arguments:
+            marge (bool): Si True, la grille est entourée d'une couche de points fantômes (comme les tampons
+                          de `limites.Bords`), chacun ayant la diffusivité du symétrique de son voisin.
+
+        Retourne:
+            tuple: Un coefficient (ou un tableau de coefficients des faces) par axe.
+        """
+        if self.carte is None:
+            return self.coefficients
+        carte = np.pad(self.carte, 1, mode='reflect') if marge else self.carte
+        return tuple(D * self.dt / d ** 2 for D, d in zip(utils.diffusivite_faces(carte), self._PasEspace()))
+
+    def _Bords(self, scenario=None):
+        """
+        Précalcule les conditions aux limites : (début, fin) de chaque axe.
+
+        Arguments:
+            scenario (dict): Les conditions qui remplacent celles de la simulation (voir `Ensemble`).
+
+        Retourne:
+            limites.Bords: Les conditions aux limites.
+        """
+        scenario = {} if scenario is None else scenario
+        noms = {'1D': ('Tg', 'Td'), '2D': ('Tg', 'Td', 'Tb', 'Th'), '3D': ('Tg', 'Td', 'Tb', 'Th', 'Tav', 'Tar')}
+        valeurs = {nom: scenario.get(nom, getattr(self, nom)) for nom in noms[self.dimension]}
+        if self.dimension == '1D':
+            conditions = [(valeurs['Tg'], valeurs['Td'])]
+        else:
+            conditions = [(valeurs['Td'], valeurs['Tg']), (valeurs['Th'], valeurs['Tb'])]
+        if self.dimension == '3D':
+            conditions.append((valeurs['Tav'], valeurs['Tar']))
+        return limites.Bords(conditions, self.forme, self._PasEspace())
+
+    def _EtatInitial(self):
+        """
+        Renvoie les températures initiales de la barre ou de la plaque, conditions aux limites comprises.
+        """
+        T = np.zeros(self.forme) + self.T
+        self.bords.Imposer(T)
+        return T
+
+    def _PasEspace(self):
+        """
+        Renvoie le pas d'espace de chaque axe ((dx,) en 1D, (dx, dy) en 2D, (dx, dy, dz) en 3D).
+        """
+        if self.dimension == '1D':
+            return (self.dx,)
+        if self.dimension == '2D':
+            return (self.dx, self.dy)
+        return (self.dx, self.dy, self.dz)
+
+    def _Instantanes(self):
+        """
+        Parcourt les instantanés de la simulation : l'historique conservé s'il existe,
+        sinon les états produits à la demande par `Flux`.
+
+        Retourne:
+            iterator: Des couples (n, T) avec n l'indice du pas de temps et T les températures.
+        """
+        if self.Tfs is not None:
+            return zip(self.indices, self.Tfs)
+        return self.Flux()
+
+    def _IndicesCouleurs(self, taille, saut=1, parallele=False, capacite=8, coupe=None):
+        """
+        Parcourt les instantanés et calcule pour chacun, d'un coup, les indices des couleurs de tous
+        les points dans une table de `utils.palette_couleurs(taille)`. L'échelle va des températures extrêmes
+        de l'historique, ou sans historique de bornes tirées de l'état initial et des bords (voir `limites.Bords.Bornes`) ;
+        si un bord impose un flux, une première passe de la simulation donne les extrêmes.
+
+        Arguments:
+            taille (int): Nombre de couleurs de la table.
+            saut (int): On ne traite qu'un instantané sur `saut` (et le dernier).
+            parallele (bool): Si True, le solveur et le calcul des couleurs tournent chacun dans un fil d'exécution,
+                              reliés par des files d'au plus `capacite` instantanés (voir `pipeline.etapes`).
+            capacite (int): Nombre maximal d'instantanés en attente entre deux étapes.
+            coupe (int): En 3D, l'indice selon z du plan affiché (voir `Coupe`).
+
+        Retourne:
+            generator: Des triplets (n, T, indices) pour chaque instant traité.
+        """
+        if self.Tfs is not None:
+            # on recupère les températures extrêmes sur tout l'historique
+            debut = time.perf_counter()
+            Tmin, Tmax = utils.extremes(self.Tfs)
+            if self.profil:
+                self.profil.Mesurer('extremes', debut)
+            # le dernier instantané est toujours traité (la simulation peut s'arrêter en régime stationnaire)
+            etats = utils.echantillonner(self._Instantanes(), saut)
+        else:
+            # sans historique, on ne demande au solveur que les instants affichés : le schéma spectral ne calcule
+            # qu'eux, et les schémas pas à pas ne transmettent (et ne copient) qu'eux. Le dernier est toujours produit.
+            pas_sortie = self.pas_sortie * saut
+            # les températures restent entre les extrêmes initiaux et ceux imposés par les bords
+            # (aux instants des sous-pas et des demi-pas des schémas)
+            finesse = 2 * self.sous_pas
+            bornes = self.bords.Bornes(np.arange((self.Nt - 1) * finesse + 1) * self.dt / finesse)
+            if bornes is None:
+                # un flux imposé peut chauffer ou refroidir sans limite : une première passe donne les extrêmes
+                debut = time.perf_counter()
+                Tmin, Tmax = np.inf, -np.inf
+                for _, T in self.Flux(pas_sortie=pas_sortie):
+                    Tmin, Tmax = min(Tmin, T.min()), max(Tmax, T.max())
+                if self.profil:
+                    self.profil.Mesurer('extremes', debut)
+                etats = self.Flux(pas_sortie=pas_sortie)
+            else:
+                etats = self.Flux(pas_sortie=pas_sortie)
+                n, T = next(etats)
+                Tmin, Tmax = min(T.min(), bornes[0]), max(T.max(), bornes[1])
+                etats = itertools.chain([(n, T)], etats)
+
+        profil = self.profil
+
+        def colorer(etat):
+            n, T = etat
+            if profil:
+                debut = time.perf_counter()
+            indices = utils.indices_couleurs(self.Coupe(T, coupe), Tmin, Tmax, taille)
+            if profil:
+                profil.Mesurer('couleurs', debut)
+            return n, T, indices
+
+        if parallele:
+            # le solveur réutilise ses tableaux : chaque état est copié dans le fil du solveur, avant le pas suivant
+            etats = ((n, T.copy()) for n, T in etats)
+            yield from pipeline.etapes(etats, [colorer], capacite)
+        else:
+            for etat in etats:
+                yield colorer(etat)
+
+    def _NombreInstantanes(self):
+        """
+        Renvoie le nombre d'instantanés de la simulation (conservés, ou à produire à la demande).
+        """
+        if self.Tfs is not None:
+            return len(self.Tfs)
+        return len(utils.indices_sortie(self.Nt, self.pas_sortie))
+
+    def Coupe(self, T, indice=None):
+        """
+        Renvoie la partie d'un état que l'on visualise : en 3D, le plan du bloc à la profondeur `indice`
+        selon z (une vue, sans copie), sinon l'état lui-même.
+
+        Arguments:
+            T (numpy.ndarray): Les températures.
+            indice (int): L'indice du plan selon z (par défaut celui du milieu).
+
+        Retourne:
+            numpy.ndarray: Les températures de la barre, de la plaque ou du plan du bloc.
+        """
+        if self.dimension != '3D':
+            return T
+        return T[..., self.Nz // 2 if indice is None else indice]
 
     @property
     def ObtenirCouleur(self):
         """
-        Calcule les couleurs correspondant aux températures pour chaque point de la simulation
-        et à chaque instant, en fonction de la dimension (1D ou 2D).
+        Calcule au fur et à mesure les couleurs correspondant aux températures pour chaque point
+        de la simulation et à chaque instant conservé, en fonction de la dimension (1D ou 2D, et en 3D
+        pour le plan du milieu du bloc, voir `Coupe`).
+        Chaque instant est traité d'un coup avec une table de couleurs précalculée.
+
+        Retourne:
+            generator: Des triplets (n, T, couleurs) pour chaque instant, avec n l'indice du pas de temps
+                       et couleurs un tableau des couleurs (r, g, b) de chaque point affiché.
         """
 
-        # en 1D
-        if self.dimension == '1D':
-            # on recupère les températures extrêmes initiales
-            Tmin = min(min(self.Tfs[i]) for i in range(len(self.Tfs)))
-            Tmax = max(max(self.Tfs[i]) for i in range(len(self.Tfs)))
-
-            # on initialise
-            couleurs = []
-            # à chaque instant
-            for i in range(len(self.Tfs)):
-                # on calcule la couleur pour chaque point en fonction de sa température
-                col = [
-                    utils.temperature_a_couleur(float(self.Tfs[i][j]), Tmin, Tmax)
-                    for j in range(len(self.Tfs[i]))
-                ]
-                # on enregistre
-                couleurs.append(col)
-        # en 2D
-        elif self.dimension == '2D':
-            # on recupère les températures extrêmes initiales
-            Tmin = min(min(row) for t in self.Tfs for row in t)
-            Tmax = max(max(row) for t in self.Tfs for row in t)
-
-            # on initialise
-            couleurs = []
-            # à chaque instant
-            for i in range(len(self.Tfs)):
-                # on initialise
-                temp_couleurs = []
-                # pour chaque plaque
-                for x in range(len(self.Tfs[i])):
-                # on calcule la couleur pour chaque point en fonction de sa température
-                    row_couleurs = [
-                        utils.temperature_a_couleur(float(self.Tfs[i][x][y]), Tmin, Tmax)
-                        for y in range(len(self.Tfs[i][x]))
-                    ]
-                    # on enregistre la colonne
-                    temp_couleurs.append(row_couleurs)
-                # on enregistre la plaque
-                couleurs.append(temp_couleurs)
-
-        return couleurs
+        # table des couleurs
+        palette = utils.palette_couleurs()
+
+        # à chaque instant, on calcule la couleur de tous les points en fonction de leur température
+        for n, T, indices in self._IndicesCouleurs(len(palette)):
+            yield n, T, palette[indices]
     
     def CreerElement(self):
         """
-        Crée la représentation graphique de la barre.
+        Crée la représentation graphique de la barre, de la plaque, ou d'un plan du bloc en 3D (voir `Coupe`).
         """
+        # vpython n'est importé que pour la visualisation
+        from vpython import box, color, vector
+
         # en 1D
         if self.dimension == '1D':
             # pour chaque subdivision
@@ -295,71 +1375,94 @@ class EquationChaleur:
                     # on l'enregistre
                     self.corps.append(portion)
 
-        # en 2D
-        elif self.dimension == '2D':
+        # en 2D (et pour le plan affiché en 3D)
+        else:
             # pour chaque subdivision x
             for i in range(self.Nx):
                 # on initialise
                 rang = []
                 # pour chaque subdivision y
-                for j in range(self.Nx):
+                for j in range(self.Ny):
                     # on calcule la position du centre
                     position_x = -self.L / 2 + i * self.dx + self.dx / 2
-                    position_y = -self.L / 2 + j * self.dx + self.dx / 2
+                    position_y = -self.H / 2 + j * self.dy + self.dy / 2
                     # on crée le petit élément le long de x
                     bloc = box(pos=vector(position_x, position_y, 0),
-                                size=vector(self.dx, self.dx, self.e),
+                                size=vector(self.dx, self.dy, self.e),
                                 color=color.blue, emissive=True)
                     # on l'enregistre
                     rang.append(bloc)
                 # on enregistre la portion
                 self.corps.append(rang)
     
-    def Simuler(self, suivre_point=False, rapport=None):
+    def Simuler(self, suivre_point=False, rapport=None, duree_lecture=20, parallele=False, capacite=8, coupe=None):
         """
         Lance la simulation de la diffusion et, si demandé, suit un ou plusieurs points
         pour afficher leur évolution de température en temps réel.
+        L'affichage se fait à `vitesse` images par seconde : si l'historique contient plus d'instantanés
+        que ce qui peut être affiché en `duree_lecture` secondes, on en saute régulièrement.
+        À chaque image, seuls les éléments dont la couleur a changé sont mis à jour.
 
         Arguments :
-            suivre_point (bool) : Si True, suit un point pendant la simulation.
-            rapport (float ou list[float]) :
-                - Pour une barre (1D), un seul rapport (float) indique la position relative sur la longueur L.
-                - Pour une plaque (2D), une liste [rapport_x, rapport_y] indique la position relative dans la plaque.
+            suivre_point (bool) : Si True, suit un ou plusieurs points pendant la simulation.
+            rapport (float ou list) :
+                - Pour une barre (1D), un rapport (float) indique la position relative sur la longueur L,
+                  une liste de rapports suit plusieurs points.
+                - Pour une plaque (2D), une liste [rapport_x, rapport_y] indique la position relative dans la plaque,
+                  une liste de telles listes suit plusieurs points.
+                - Pour un bloc (3D), une liste [rapport_x, rapport_y, rapport_z], ou une liste de telles listes.
+            duree_lecture (float) : Durée maximale de la lecture en secondes (None pour tout afficher).
+            parallele (bool) : Si True, le solveur et le calcul des couleurs tournent en arrière-plan pendant
+                               l'affichage, reliés à lui par des files bornées : la lecture commence dès les premiers
+                               instantanés calculés (avec `differe=True`, sans attendre la fin de la résolution).
+            capacite (int) : Nombre maximal d'instantanés en attente entre deux étapes (mémoire bornée).
+            coupe (int) : En 3D, l'indice selon z du plan du bloc affiché (par défaut celui du milieu).
         """
+        # vpython n'est importé que pour la visualisation
+        from vpython import color, gcurve, graph, label, rate, vector
 
         # on crée de l'élément (barre ou plaque)
         self.CreerElement()
 
-        # on récupère les couleurs
-        couleurs = self.ObtenirCouleur
+        # table des couleurs, et couleurs vpython correspondantes créées une seule fois
+        palette = utils.palette_couleurs()
+        couleurs_vpython = [vector(*couleur) for couleur in palette]
+        # éléments graphiques dans l'ordre des points
+        elements = self.corps if self.dimension == '1D' else [bloc for rang in self.corps for bloc in rang]
+
+        # on saute des instantanés si l'historique est plus dense que ce qu'on peut afficher
+        nombre = self._NombreInstantanes()
+        saut = 1 if duree_lecture is None else max(1, math.ceil(nombre / (self.vitesse * duree_lecture)))
+        # on récupère les couleurs, calculées au fur et à mesure de la simulation
+        couleurs = self._IndicesCouleurs(len(palette), saut, parallele, capacite, coupe)
 
-        pos_x, pos_y = (- self.L / 7, - 3 * self.L / 5) if self.dimension == '2D' else (- 5 * self.e / 3, - self.e)
+        pos_x, pos_y = (- 5 * self.e / 3, - self.e) if self.dimension == '1D' else (- self.L / 7, - 3 * self.H / 5)
 
         # on initialise le temps de simulation restant
         temps_restant_label = label(pos=vector(pos_x, pos_y, 0),
                                     text="Temps restant pour la diffusion : {:.2f} s".format(self.duree),
                                     box=False, height=12, color=color.white)
 
-        # suivi de point si demandé
+        # suivi de points si demandé
         if suivre_point:
-            temperatures = []
-
             if self.dimension == '1D':
                 if rapport is None:
                     raise ValueError("Veuillez fournir un rapport pour le suivi du point en 1D.")
-                # on calcul la position et indices encadrants
-                point = self.L * rapport - self.L / 2
-                index_1, index_2 = utils.trouver_encadrement(point, self.centres)
-                titre = f"Évolution de la température au point d'abcisse {self.L * np.array(rapport)}."
+                positions = ", ".join(f"{self.L * r:g}" for r in np.ravel(rapport))
+                titre = f"Évolution de la température au point d'abcisse {positions}."
             elif self.dimension == '2D':
-                if rapport is None or not isinstance(rapport, list) or len(rapport) != 2:
+                if rapport is None or not isinstance(rapport, list) or np.shape(rapport)[-1] != 2:
                     raise ValueError("Veuillez fournir un rapport [rapport_x, rapport_y] pour le suivi du point en 2D.")
-                # on calcul les positions et indices encadrants
-                point_x = self.L * rapport[0] - self.L / 2
-                point_y = self.L * rapport[1] - self.L / 2
-                index_x1, index_x2 = utils.trouver_encadrement(point_x, self.centres)
-                index_y1, index_y2 = utils.trouver_encadrement(point_y, self.centres)
-                titre = f"Évolution de la température au point de coordonnée ({self.L * rapport[0]}, {self.L * rapport[1]})."
+                positions = ", ".join(f"({self.L * rx:g}, {self.H * ry:g})" for rx, ry in np.reshape(rapport, (-1, 2)))
+                titre = f"Évolution de la température au point de coordonnée {positions}."
+            else:
+                if rapport is None or not isinstance(rapport, list) or np.shape(rapport)[-1] != 3:
+                    raise ValueError("Veuillez fournir un rapport [rapport_x, rapport_y, rapport_z] pour le suivi du point en 3D.")
+                positions = ", ".join(f"({self.L * rx:g}, {self.H * ry:g}, {self.P * rz:g})"
+                                      for rx, ry, rz in np.reshape(rapport, (-1, 3)))
+                titre = f"Évolution de la température au point de coordonnée {positions}."
+            # indices et poids d'interpolation calculés une seule fois
+            sondes = self.PreparerSondes(rapport)
 
             # on crée le graphique
             graph(
@@ -370,43 +1473,46 @@ class EquationChaleur:
                 height=400,
                 background=color.white,
             )
-            temperature_curve = gcurve(color=color.red)
+            # une courbe par point suivi
+            teintes = [color.red, color.blue, color.green, color.orange, color.purple, color.cyan, color.magenta]
+            courbes = [gcurve(color=teintes[k % len(teintes)]) for k in range(len(sondes[1]))]
         
         # simulation de la diffusion
-        for t in range(self.Nt):
+        profil = self.profil
+        precedents = None
+        for n, T, indices in couleurs:
+            # une seule attente par image
+            if profil:
+                debut = time.perf_counter()
+            rate(self.vitesse)
+            if profil:
+                debut = profil.Mesurer('attente', debut)
+
             # on met à jour le temps restant
-            temps_ecoule = t * self.dt
+            temps_ecoule = n * self.dt
             temps_restant = self.duree - temps_ecoule
             temps_restant_label.text = "Temps restant pour la diffusion : {:.2f} s".format(temps_restant)
 
-            if self.dimension == '1D':
-                for j in range(self.Nx):
-                    rate(self.vitesse)
-                    self.corps[j].color = couleurs[t][j]
-
-                # on met à jour le suivi du point en 1D
-                if suivre_point:
-                    temp = utils.moyenne_ponderee(index_1, index_2, self.Tfs[t], self.centres, point)
-                    temperatures.append(temp)
-                    temperature_curve.plot(temps_ecoule, temp)
+            # on ne met à jour que les éléments dont la couleur a changé
+            indices = indices.ravel()
+            changes = range(len(indices)) if precedents is None else np.flatnonzero(indices != precedents)
+            for k in changes:
+                elements[k].color = couleurs_vpython[indices[k]]
+            precedents = indices
+            if profil:
+                debut = profil.Mesurer('affichage', debut)
+                profil.Compter('images')
+                profil.Compter('elements_mis_a_jour', len(changes))
 
-            elif self.dimension == '2D':
-                for i in range(self.Nx):
-                    for j in range(self.Nx):
-                        rate(self.vitesse)
-                        self.corps[i][j].color = couleurs[t][i][j]
-
-                # on met à jour le suivi du point en 2D
-                if suivre_point:
-                    temp_x1 = utils.moyenne_ponderee(index_y1, index_y2, self.Tfs[t][index_x1], self.centres, point_y)
-                    temp_x2 = utils.moyenne_ponderee(index_y1, index_y2, self.Tfs[t][index_x2], self.centres, point_y)
-                    tempx = (temp_x1 + temp_x2)/2
-                    temp_y1 = utils.moyenne_ponderee(index_x1, index_x2, self.Tfs[t][index_y1], self.centres, point_x)
-                    temp_y2 = utils.moyenne_ponderee(index_x1, index_x2, self.Tfs[t][index_y2], self.centres, point_x)
-                    tempy = (temp_y1 + temp_y2)/2
-                    temp = (tempx + tempy)/2
-                    temperatures.append(temp)
-                    temperature_curve.plot(temps_ecoule, temp)
+            # on met à jour le suivi des points, tous interpolés d'un coup
+            if suivre_point:
+                for courbe, temp in zip(courbes, utils.interpoler_sondes(T, sondes)):
+                    courbe.plot(temps_ecoule, temp)
+                if profil:
+                    profil.Mesurer('suivi', debut)
 
         # on force le temps à 0s à la fin de la simulation
-        temps_restant_label.text = "Temps restant pour la diffusion : {:.2f} s".format(0.00)
\ No newline at end of file
+        temps_restant_label.text = "Temps restant pour la diffusion : {:.2f} s".format(0.00)
+        # sauf si elle s'est arrêtée plus tôt, en régime stationnaire
+        if self.t_stationnaire is not None:
+            temps_restant_label.text = "Régime stationnaire atteint à {:.2f} s".format(self.t_stationnaire)
\ No newline at end of file
@@ -0,0 +1,171 @@
+import json
+import os
+import numpy as np
+import utils
+
+
+def chemin_metadonnees(chemin):
+    """
+    Renvoie le chemin du fichier de métadonnées associé à un historique enregistré.
+
+    Arguments:
+        chemin (str): Le chemin du fichier `.npy` de l'historique.
+
+    Retourne:
+        str: Le chemin du fichier `.json` des métadonnées.
+    """
+    return chemin + '.json'
+
+
+def _convertir(valeur):
+    """
+    Convertit les valeurs numpy (scalaires, tableaux) et les conditions aux limites (`limites`)
+    en valeurs Python sérialisables en JSON.
+    """
+    if hasattr(valeur, 'tolist'):
+        return valeur.tolist()
+    if hasattr(valeur, 'Parametres'):
+        return valeur.Parametres()
+    raise TypeError(f"Valeur non sérialisable : {valeur!r}")
+
+
+def lire_metadonnees(chemin):
+    """
+    Lit les métadonnées d'un historique enregistré.
+
+    Arguments:
+        chemin (str): Le chemin du fichier `.npy` de l'historique.
+
+    Retourne:
+        dict: Les métadonnées (paramètres, schéma, pas, nombre d'instantanés écrits...).
+    """
+    with open(chemin_metadonnees(chemin), encoding='utf-8') as fichier:
+        return json.load(fichier)
+
+
+def ecrire_metadonnees(chemin, metadonnees):
+    """
+    Écrit les métadonnées d'un historique. L'écriture passe par un fichier temporaire renommé,
+    les métadonnées restent donc lisibles même si le programme est interrompu pendant l'écriture.
+
+    Arguments:
+        chemin (str): Le chemin du fichier `.npy` de l'historique.
+        metadonnees (dict): Les métadonnées à écrire.
+    """
+    temporaire = chemin_metadonnees(chemin) + '.tmp'
+    with open(temporaire, 'w', encoding='utf-8') as fichier:
+        json.dump(metadonnees, fichier, default=_convertir, ensure_ascii=False, indent=2)
+    os.replace(temporaire, chemin_metadonnees(chemin))
+
+
+def ouvrir(chemin):
+    """
+    Ouvre un historique enregistré en lecture seule, sans le charger en mémoire :
+    les instantanés sont lus directement dans le fichier au moment où on y accède.
+
+    Arguments:
+        chemin (str): Le chemin du fichier `.npy` de l'historique.
+
+    Retourne:
+        tuple (dict, numpy.ndarray, numpy.memmap): Les métadonnées, les indices des pas de temps
+                                                   et les instantanés écrits.
+    """
+    metadonnees = lire_metadonnees(chemin)
+    etats = np.load(chemin, mmap_mode='r')
+    ecrits = metadonnees['ecrits']
+    return metadonnees, np.array(metadonnees['indices'][:ecrits]), etats[:ecrits]
+
+
+def enregistrer(equation, chemin, pas_sortie=None, reprendre=False, frequence=100):
+    """
+    Résout l'équation en écrivant les instantanés au fur et à mesure dans un fichier `.npy`
+    préalloué et projeté en mémoire, accompagné d'un fichier de métadonnées `.json`.
+    L'historique peut donc être bien plus grand que la mémoire vive.
+
+    Arguments:
+        equation (EquationChaleur): La simulation à résoudre.
+        chemin (str): Le chemin du fichier `.npy` à écrire.
+        pas_sortie (int): On conserve un instantané tous les `pas_sortie` pas de temps (et l'état final).
+        reprendre (bool): Si True et que le fichier existe, on reprend la simulation au dernier
+                          instantané écrit au lieu de tout recalculer.
+        frequence (int): Nombre d'instantanés entre deux points de reprise (écriture sur le disque
+                         et mise à jour des métadonnées).
+
+    Retourne:
+        tuple (dict, numpy.ndarray, numpy.memmap): Comme `ouvrir`.
+
+    Lève une erreur si on reprend un historique calculé avec d'autres paramètres
+    (le schéma n'est comparé que s'il a été imposé).
+    """
+    pas_sortie = equation.pas_sortie if pas_sortie is None else pas_sortie
+    indices = utils.indices_sortie(equation.Nt, pas_sortie)
+
+    if reprendre and equation.schema_demande is None and os.path.exists(chemin_metadonnees(chemin)):
+        # schéma choisi automatiquement : on reprend avec celui de l'historique (les mesures de coût
+        # peuvent départager autrement deux schémas de coûts voisins)
+        existantes = lire_metadonnees(chemin)
+        equation.schema, equation.sous_pas = existantes['schema'], existantes['sous_pas']
+
+    metadonnees = {
+        'parametres': equation.Parametres(),
+        'schema': equation.schema,
+        'sous_pas': equation.sous_pas,
+        'D': equation.D,
+        'dt': equation.dt,
+        'dx': equation.dx,
+        'r': equation.r,
+        'pas_sortie': pas_sortie,
+        'indices': indices,
+        'ecrits': 0,
+        'termine': False,
+    }
+    # passage par JSON pour comparer avec les métadonnées lues
+    metadonnees = json.loads(json.dumps(metadonnees, default=_convertir))
+
+    depart = None
+    if reprendre and os.path.exists(chemin) and os.path.exists(chemin_metadonnees(chemin)):
+        existantes = lire_metadonnees(chemin)
+        # les indices écrits et l'avancement dépendent de l'arrêt en régime stationnaire
+        avancement = ('indices', 'ecrits', 'termine')
+        if ({cle: valeur for cle, valeur in existantes.items() if cle not in avancement}
+                != {cle: valeur for cle, valeur in metadonnees.items() if cle not in avancement}):
+            raise ValueError("L'historique à reprendre a été calculé avec d'autres paramètres.")
+        ecrits = existantes['ecrits']
+        metadonnees['ecrits'] = ecrits
+        metadonnees['termine'] = existantes.get('termine', ecrits == len(indices))
+        metadonnees['indices'][:ecrits] = existantes['indices'][:ecrits]
+        indices = np.array(metadonnees['indices'])
+        etats = np.lib.format.open_memmap(chemin, mode='r+')
+        # on repart du dernier instantané écrit
+        if ecrits > 0:
+            depart = (int(indices[ecrits - 1]), etats[ecrits - 1])
+    else:
+        # on détermine la forme d'un état avec l'état initial
+        _, T = next(equation.Flux(pas_sortie=pas_sortie))
+        etats = np.lib.format.open_memmap(chemin, mode='w+', dtype=np.float64,
+                                          shape=(len(indices),) + T.shape)
+        ecrire_metadonnees(chemin, metadonnees)
+
+    ecrits = metadonnees['ecrits']
+    if not metadonnees['termine']:
+        for n, T in equation.Flux(pas_sortie=pas_sortie, depart=depart):
+            # l'état de reprise est déjà écrit
+            if ecrits > 0 and n <= indices[ecrits - 1]:
+                continue
+            etats[ecrits] = T
+            # la simulation peut s'arrêter plus tôt (régime stationnaire) : on note le pas réel
+            metadonnees['indices'][ecrits] = n
+            ecrits += 1
+            # point de reprise
+            if ecrits % frequence == 0:
+                etats.flush()
+                metadonnees['ecrits'] = ecrits
+                ecrire_metadonnees(chemin, metadonnees)
+
+        etats.flush()
+        metadonnees['ecrits'] = ecrits
+        metadonnees['termine'] = True
+        ecrire_metadonnees(chemin, metadonnees)
+
+    del etats
+    return ouvrir(chemin)
@@ -1,6 +1,6 @@
-from vpython import *
 import numpy as np
 import bisect
+import itertools
 
 diffusivite_thermique_materiaux = { #en mm2/s
     "Acier": 22.8,
@@ -39,6 +39,9 @@ def temperature_a_couleur(temp, temp_min, temp_max):
     Retourne:
     - vector : Couleur VPython correspondante.
     """
+    # vpython n'est importé que pour la visualisation
+    from vpython import vector
+
     # on normalise la température entre [0, 1]
     norm_temp = (temp - temp_min) / (temp_max - temp_min)
     norm_temp = max(0, min(1, norm_temp))  # précaution
@@ -71,6 +74,101 @@ def temperature_a_couleur(temp, temp_min, temp_max):
 
     return vector(r, g, b)
 
+def couleurs_normees(norm_temp):
+    """
+    Version vectorisée de `temperature_a_couleur` : renvoie les couleurs (même palette en cinq bandes)
+    de tout un tableau de températures déjà normées entre 0 et 1.
+
+    Arguments:
+    - norm_temp : numpy.ndarray - Températures normées (les valeurs hors de [0, 1] sont ramenées aux bornes).
+
+    Retourne:
+    - numpy.ndarray : Les couleurs (r, g, b), de forme norm_temp.shape + (3,).
+    """
+    n = np.clip(np.asarray(norm_temp, dtype=float), 0, 1)
+    # les cinq bandes, la première condition vraie l'emporte
+    bandes = [n <= 0.2, n <= 0.4, n <= 0.6, n <= 0.8, np.ones(n.shape, dtype=bool)]
+    r = np.select(bandes, [0, 0, (n - 0.4) / 0.2, 1, 1 - (n - 0.8) / 0.4])
+    g = np.select(bandes, [0, (n - 0.2) / 0.2, 1, 1 - (n - 0.6) / 0.4, 0])
+    b = np.select(bandes, [0.5 + 2.5 * n, 1, 1 - (n - 0.4) / 0.2, 0, 0])
+    return np.stack([r, g, b], axis=-1)
+
+def palette_couleurs(taille=1000):
+    """
+    Précalcule une table de correspondance des couleurs : l'intervalle [0, 1] des températures normées
+    est découpé en `taille` cases, chacune prenant la couleur de son milieu.
+
+    Arguments:
+    - taille : int - Nombre de couleurs de la table. Un multiple de 5 fait tomber les limites
+                     des bandes entre deux cases.
+
+    Retourne:
+    - numpy.ndarray : La table des couleurs (r, g, b), de forme (taille, 3).
+    """
+    return couleurs_normees((np.arange(taille) + 0.5) / taille)
+
+def indices_couleurs(T, temp_min, temp_max, taille=1000):
+    """
+    Normalise tout un tableau de températures et renvoie, pour chaque point, l'indice de sa couleur
+    dans une table de `palette_couleurs(taille)`.
+
+    Arguments:
+    - T : numpy.ndarray - Températures (un instant ou tout l'historique).
+    - temp_min : float - Température minimale de la série.
+    - temp_max : float - Température maximale de la série.
+    - taille : int - Nombre de couleurs de la table.
+
+    Retourne:
+    - numpy.ndarray : Les indices des couleurs, de même forme que T.
+    """
+    ecart = temp_max - temp_min
+    if ecart == 0:
+        return np.zeros(np.shape(T), dtype=np.intp)
+    norm_temp = (np.asarray(T) - temp_min) * (taille / ecart)
+    return np.clip(norm_temp, 0, taille - 1).astype(np.intp)
+
+def echantillonner(elements, saut):
+    """
+    Parcourt une suite en ne gardant qu'un élément sur `saut`, ainsi que le dernier
+    (dont on ne connaît pas forcément la position à l'avance).
+
+    Arguments :
+    elements : iterable - La suite à parcourir.
+    saut : int - On garde un élément sur `saut`.
+
+    Retourne :
+    generator - Les éléments gardés.
+    """
+    saute = None
+    for k, element in enumerate(elements):
+        if k % saut == 0:
+            saute = None
+            yield element
+        else:
+            saute = element
+    if saute is not None:
+        yield saute
+
+
+def extremes(etats, taille_bloc=64):
+    """
+    Calcule les températures extrêmes de tout un historique en un seul passage,
+    bloc d'instantanés par bloc (l'historique peut être projeté en mémoire depuis le disque).
+
+    Arguments:
+    - etats : numpy.ndarray - Les températures, un instant par ligne.
+    - taille_bloc : int - Nombre d'instantanés lus à la fois.
+
+    Retourne:
+    - tuple (float, float) : Les températures minimale et maximale.
+    """
+    temp_min, temp_max = np.inf, -np.inf
+    for debut in range(0, len(etats), taille_bloc):
+        bloc = np.asarray(etats[debut:debut + taille_bloc])
+        temp_min = min(temp_min, bloc.min())
+        temp_max = max(temp_max, bloc.max())
+    return temp_min, temp_max
+
 def matrice_diagonale(taille, valeur):
     """
     Génère une matrice diagonale de taille n × n.
@@ -114,6 +212,143 @@ def matrice_tridiagonale(n, c1, c2):
     
     return M
 
+def diagonales_tridiagonales(n, c1, c2):
+    """
+    Génère les trois diagonales d'une matrice tridiagonale de taille n × n,
+    sans jamais former la matrice pleine (stockage en O(n)).
+
+    Arguments :
+    n : int - Taille de la matrice (n × n).
+    c1 : float - Valeur sur la diagonale principale.
+    c2 : float - Valeur sur les diagonales immédiatement au-dessus et au-dessous.
+
+    Retourne :
+    tuple (numpy.ndarray, numpy.ndarray, numpy.ndarray) - Diagonales inférieure (n - 1),
+                                                          principale (n) et supérieure (n - 1).
+    """
+    return np.full(n - 1, c2, dtype=float), np.full(n, c1, dtype=float), np.full(n - 1, c2, dtype=float)
+
+def produit_tridiagonal(diagonales, X, axe=0, sortie=None, travail=None):
+    """
+    Calcule le produit MX où M est une matrice tridiagonale donnée par ses diagonales.
+
+    Arguments :
+    diagonales : tuple - Diagonales (inférieure, principale, supérieure) de M. Elles peuvent aussi avoir
+                         plusieurs colonnes (n × k), une matrice différente par colonne, alignées
+                         sur les derniers axes de X.
+    X : numpy.ndarray - Vecteur (n) ou tableau (n × ...) dont chaque colonne est multipliée par M.
+    axe : int - L'axe de X selon lequel on multiplie (les autres axes sont des colonnes).
+    sortie, travail : numpy.ndarray - Si donnés, tableaux de la forme de X : le produit est écrit dans `sortie`
+                                      et `travail` reçoit les produits intermédiaires, sans allocation.
+
+    Retourne :
+    numpy.ndarray - Le produit MX, de même forme que X.
+    """
+    inf, diag, sup = diagonales
+    X = np.moveaxis(X, axe, 0)
+    # on aligne les diagonales sur le premier axe de X (et leurs colonnes éventuelles sur les derniers)
+    forme = (-1,) + (1,) * (X.ndim - diag.ndim) + diag.shape[1:]
+    if sortie is None:
+        Y = diag.reshape(forme) * X
+        Y[:-1] += sup.reshape(forme) * X[1:]
+        Y[1:] += inf.reshape(forme) * X[:-1]
+        return np.moveaxis(Y, 0, axe)
+    Y = np.multiply(diag.reshape(forme), X, out=np.moveaxis(sortie, axe, 0))
+    travail = np.moveaxis(travail, axe, 0)[1:]
+    Y[:-1] += np.multiply(sup.reshape(forme), X[1:], out=travail)
+    Y[1:] += np.multiply(inf.reshape(forme), X[:-1], out=travail)
+    return sortie
+
+def factoriser_tridiagonale(diagonales):
+    """
+    Factorise une matrice tridiagonale (algorithme de Thomas) une fois pour toutes,
+    afin de résoudre ensuite chaque système en O(n) avec `resoudre_tridiagonale`.
+
+    Arguments :
+    diagonales : tuple - Diagonales (inférieure, principale, supérieure) de A. Des diagonales de forme
+                         (n, k) donnent une matrice différente pour chacune des k colonnes du second membre.
+
+    Retourne :
+    tuple (numpy.ndarray, numpy.ndarray, numpy.ndarray) - Diagonale inférieure, coefficients
+                                                          de remontée et inverses des pivots.
+
+    Lève une erreur si un pivot est nul (matrice singulière).
+    """
+    inf, diag, sup = diagonales
+    n = len(diag)
+    remontee = np.zeros((n - 1,) + diag.shape[1:])
+    inv_pivots = np.zeros(diag.shape)
+
+    # élimination de la diagonale inférieure
+    pivot = diag[0]
+    for i in range(n):
+        if i > 0:
+            pivot = diag[i] - inf[i - 1] * remontee[i - 1]
+        if np.any(pivot == 0):
+            raise ValueError("La matrice A est singulière ou mal conditionnée.")
+        inv_pivots[i] = 1 / pivot
+        if i < n - 1:
+            remontee[i] = sup[i] * inv_pivots[i]
+
+    return inf, remontee, inv_pivots
+
+def resoudre_tridiagonale(factorisation, B, axe=0, travail=None):
+    """
+    Résout l'équation matricielle AX = B avec la factorisation de A (algorithme de Thomas), en O(n).
+
+    Arguments :
+    factorisation : tuple - Résultat de `factoriser_tridiagonale(A)`.
+    B : numpy.ndarray - Vecteur (n) ou tableau (n × ...) des termes constants,
+                        chaque colonne étant un second membre.
+    axe : int - L'axe de B selon lequel on résout (les autres axes sont des colonnes).
+    travail : numpy.ndarray - Si donné, tableau de flottants de la forme de B avec l'axe `axe` en premier,
+                              dans lequel la solution est calculée (sans allocation).
+
+    Retourne :
+    numpy.ndarray - Solution X de l'équation AX = B, de même forme que B (une vue sur `travail` s'il est donné).
+    """
+    inf, remontee, inv_pivots = factorisation
+    n = len(inv_pivots)
+    if np.ndim(B) == 1 and inv_pivots.ndim == 1:
+        # un seul second membre (1D) : la boucle sur des flottants Python évite le coût fixe d'une opération
+        # numpy par point, elle est 3 à 5 fois plus rapide (voir `benchmark.py --tridiagonale`)
+        X = _resoudre_tridiagonale_scalaire(inf.tolist(), remontee.tolist(), inv_pivots.tolist(),
+                                            np.asarray(B, dtype=float).tolist())
+        if travail is None:
+            return np.array(X)
+        travail[:] = X
+        return travail
+    # les lignes de l'axe sont rendues contiguës : la boucle parcourt des blocs entiers
+    if travail is None:
+        X = np.array(np.moveaxis(B, axe, 0), dtype=float, order='C')
+    else:
+        X = travail
+        np.copyto(X, np.moveaxis(B, axe, 0))
+
+    # descente
+    X[0] *= inv_pivots[0]
+    for i in range(1, n):
+        X[i] -= inf[i - 1] * X[i - 1]
+        X[i] *= inv_pivots[i]
+    # remontée
+    for i in range(n - 2, -1, -1):
+        X[i] -= remontee[i] * X[i + 1]
+
+    return np.moveaxis(X, 0, axe)
+
+def _resoudre_tridiagonale_scalaire(inf, remontee, inv_pivots, x):
+    """
+    Algorithme de Thomas sur des listes de flottants (un seul second membre, voir `resoudre_tridiagonale`).
+    Mêmes opérations dans le même ordre que la version numpy : le résultat est identique au bit près.
+    """
+    n = len(inv_pivots)
+    x[0] *= inv_pivots[0]
+    for i in range(1, n):
+        x[i] = (x[i] - inf[i - 1] * x[i - 1]) * inv_pivots[i]
+    for i in range(n - 2, -1, -1):
+        x[i] -= remontee[i] * x[i + 1]
+    return x
+
 def resoudre_equation_matricielle(A, B):
     """
     Résout l'équation matricielle AX = B.
@@ -134,6 +369,217 @@ def resoudre_equation_matricielle(A, B):
     except np.linalg.LinAlgError as e:
         raise ValueError("La matrice A est singulière ou mal conditionnée.") from e
 
+def pas_explicite(T_avant, r, T_mtn=None, travail=None):
+    """
+    Calcule un pas du schéma d'Euler explicite sur tous les points intérieurs à la fois (1D, 2D ou 3D),
+    par découpage du tableau au lieu de boucles sur les indices. Le coefficient peut différer selon
+    les axes (pas d'espace différents).
+    Les opérations sont faites dans le même ordre que la formule point par point,
+    le résultat est donc identique au bit près.
+    Les bords de T_mtn ne sont pas modifiés, les conditions aux limites sont à réimposer ensuite.
+    Avec un coefficient par axe, les axes d'espace sont les derniers : les premiers axes éventuels
+    séparent des scénarios calculés ensemble.
+
+    Arguments :
+    T_avant : numpy.ndarray - Températures à l'instant d'avant.
+    r : float ou list[float] - Coefficient r = D.dt/dx², ou un coefficient par axe.
+    T_mtn : numpy.ndarray - Tableau de sortie de même forme que T_avant (distinct de T_avant).
+                            Si None, un nouveau tableau est alloué.
+    travail : numpy.ndarray - Tampon de travail de la forme de l'intérieur (T_avant[1:-1, ...]).
+                              Si None, un nouveau tableau est alloué.
+
+    Retourne :
+    numpy.ndarray - T_mtn, les températures à l'instant suivant (intérieur seulement).
+    """
+    if T_mtn is None:
+        T_mtn = np.zeros_like(T_avant)
+    coefficients = r if np.ndim(r) else (r,) * T_avant.ndim
+
+    # découpage de l'intérieur selon chaque axe d'espace
+    interieur = (Ellipsis,) + (slice(1, -1),) * len(coefficients)
+    centre = T_avant[interieur]
+    sortie = T_mtn[interieur]
+    if travail is None:
+        travail = np.empty_like(centre)
+
+    # pour chaque direction on ajoute r (T[i - 1] - 2 T[i] + T[i + 1])
+    for axe in range(len(coefficients)):
+        avant = interieur[:axe + 1] + (slice(None, -2),) + interieur[axe + 2:]
+        apres = interieur[:axe + 1] + (slice(2, None),) + interieur[axe + 2:]
+        np.multiply(centre, 2, out=travail)
+        np.subtract(T_avant[avant], travail, out=travail)
+        np.add(travail, T_avant[apres], out=travail)
+        np.multiply(travail, coefficients[axe], out=travail)
+        # la première direction part de T[i], les suivantes s'ajoutent
+        np.add(centre if axe == 0 else sortie, travail, out=sortie)
+
+    return T_mtn
+
+def diffusivite_faces(D):
+    """
+    Calcule la diffusivité sur les faces entre deux points voisins d'une grille hétérogène,
+    par moyenne harmonique (la moyenne qui conserve le flux à travers une interface entre deux matériaux).
+
+    Arguments :
+    D : numpy.ndarray - La diffusivité de chaque point (1D ou 2D).
+
+    Retourne :
+    list[numpy.ndarray] - Pour chaque axe, la diffusivité des faces (un de moins que de points selon cet axe).
+    """
+    faces = []
+    for axe in range(D.ndim):
+        avant = (slice(None),) * axe + (slice(None, -1),)
+        apres = (slice(None),) * axe + (slice(1, None),)
+        faces.append(2 * D[avant] * D[apres] / (D[avant] + D[apres]))
+    return faces
+
+def tampons_flux(forme, lots=()):
+    """
+    Alloue les tampons de travail de `pas_explicite_variable` pour une grille.
+
+    Arguments :
+    forme : tuple - La forme de la grille (points fantômes compris).
+    lots : tuple - La forme des premiers axes, qui séparent des scénarios calculés ensemble.
+
+    Retourne :
+    list[numpy.ndarray] - Un tampon par axe : les flux entre voisins selon l'axe, sur l'intérieur des autres axes.
+    """
+    return [np.empty(tuple(lots) + tuple(n - 1 if a == axe else n - 2 for a, n in enumerate(forme)))
+            for axe in range(len(forme))]
+
+def pas_explicite_variable(T_avant, faces, T_mtn=None, travail=None):
+    """
+    Calcule un pas du schéma d'Euler explicite à diffusivité variable sur tous les points intérieurs à la fois,
+    sous forme conservative : chaque point reçoit la différence des flux c (T[i + 1] - T[i]) de ses deux faces.
+    Les bords de T_mtn ne sont pas modifiés, les conditions aux limites sont à réimposer ensuite.
+    Les axes d'espace sont les derniers : les premiers axes éventuels séparent des scénarios calculés ensemble.
+
+    Arguments :
+    T_avant : numpy.ndarray - Températures à l'instant d'avant.
+    faces : list[numpy.ndarray] - Le coefficient D.dt/dx² de chaque face, pour chaque axe (voir `diffusivite_faces`).
+    T_mtn : numpy.ndarray - Tableau de sortie de même forme que T_avant (distinct de T_avant).
+                            Si None, un nouveau tableau est alloué.
+    travail : list[numpy.ndarray] - Les tampons de `tampons_flux(T_avant.shape)`. Si None, ils sont alloués.
+
+    Retourne :
+    numpy.ndarray - T_mtn, les températures à l'instant suivant (intérieur seulement).
+    """
+    if T_mtn is None:
+        T_mtn = np.zeros_like(T_avant)
+    dimension = len(faces)
+    if travail is None:
+        travail = tampons_flux(T_avant.shape[-dimension:], T_avant.shape[:-dimension])
+
+    interieur = (Ellipsis,) + (slice(1, -1),) * dimension
+    sortie = T_mtn[interieur]
+    sortie[...] = T_avant[interieur]
+    for axe, (coefficients, flux) in enumerate(zip(faces, travail)):
+        # toutes les faces de l'axe, sur l'intérieur des autres axes
+        autour = interieur[:axe + 1] + (slice(None),) + interieur[axe + 2:]
+        avant = interieur[:axe + 1] + (slice(None, -1),) + interieur[axe + 2:]
+        apres = interieur[:axe + 1] + (slice(1, None),) + interieur[axe + 2:]
+        np.subtract(T_avant[apres], T_avant[avant], out=flux)
+        np.multiply(flux, coefficients[autour], out=flux)
+        # flux entrant par la face suivante moins flux sortant par la face précédente
+        decalage = (Ellipsis,) + (slice(None),) * axe
+        sortie += flux[decalage + (slice(1, None),) + (slice(None),) * (dimension - 1 - axe)]
+        sortie -= flux[decalage + (slice(None, -1),) + (slice(None),) * (dimension - 1 - axe)]
+    return T_mtn
+
+def operateur_implicite(forme, coefficients):
+    """
+    Construit la matrice creuse I - L de la diffusion implicite sur les points intérieurs d'une grille
+    (3 points en 1D, 5 points en 2D, 7 points en 3D), L étant le laplacien discret pondéré par un coefficient par axe
+    et les bords valant 0 (leur contribution passe dans le second membre).
+    On ne stocke que la diagonale et, pour chaque axe, le couplage entre deux points voisins :
+    la matrice (N² coefficients pour N points) n'est jamais formée.
+
+    Arguments :
+    forme : tuple - La forme de l'intérieur de la grille.
+    coefficients : list[float] - Le coefficient de chaque axe (r/2 pour Crank-Nicholson).
+
+    Retourne :
+    tuple (numpy.ndarray, list[numpy.ndarray]) - La diagonale, de la forme de la grille, et les couplages
+                                                 de chaque axe (un de moins que de points selon cet axe).
+    """
+    diagonale = np.full(forme, 1 + 2 * sum(coefficients), dtype=float)
+    couplages = []
+    for axe, coefficient in enumerate(coefficients):
+        forme_axe = list(forme)
+        forme_axe[axe] -= 1
+        couplages.append(np.full(forme_axe, -coefficient, dtype=float))
+    return diagonale, couplages
+
+def produit_operateur(operateur, X, sortie=None):
+    """
+    Calcule le produit de la matrice creuse de `operateur_implicite` par X, par découpage du tableau.
+
+    Arguments :
+    operateur : tuple - La diagonale et les couplages de la matrice.
+    X : numpy.ndarray - Le vecteur, de la forme de la grille (éventuellement précédée d'axes de scénarios,
+                        la matrice étant alors la même pour tous).
+    sortie : numpy.ndarray - Tableau de sortie (distinct de X), alloué si None.
+
+    Retourne :
+    numpy.ndarray - Le produit, de la forme de la grille.
+    """
+    diagonale, couplages = operateur
+    sortie = np.multiply(diagonale, X, out=sortie)
+    for axe, couplage in enumerate(couplages):
+        # les axes d'espace sont les derniers (les premiers éventuels séparent des scénarios)
+        suite = (slice(None),) * (len(couplages) - 1 - axe)
+        avant = (Ellipsis, slice(None, -1)) + suite
+        apres = (Ellipsis, slice(1, None)) + suite
+        # chaque point est couplé à ses voisins précédent et suivant selon l'axe
+        sortie[avant] += couplage * X[apres]
+        sortie[apres] += couplage * X[avant]
+    return sortie
+
+def gradient_conjugue(operateur, B, X, tolerance=1e-10, iterations_max=None):
+    """
+    Résout le système symétrique défini positif operateur . X = B par la méthode du gradient conjugué
+    préconditionné par la diagonale (Jacobi). X contient au départ une estimation de la solution
+    (par exemple l'état précédent), ce qui réduit le nombre d'itérations, et reçoit la solution.
+
+    Arguments :
+    operateur : tuple - La matrice creuse de `operateur_implicite`.
+    B : numpy.ndarray - Le second membre, de la forme de la grille.
+    X : numpy.ndarray - L'estimation de départ, remplacée par la solution (en place).
+    tolerance : float - On s'arrête quand la norme du résidu est inférieure à `tolerance` fois celle de B.
+    iterations_max : int - Nombre maximal d'itérations (par défaut le nombre d'inconnues).
+
+    Retourne :
+    int - Le nombre d'itérations effectuées.
+
+    Lève une erreur si la méthode n'a pas convergé.
+    """
+    diagonale = operateur[0]
+    seuil = (tolerance * np.linalg.norm(B)) ** 2
+    iterations_max = X.size if iterations_max is None else iterations_max
+
+    # résidu, résidu préconditionné et direction de descente
+    R = B - produit_operateur(operateur, X)
+    Z = R / diagonale
+    P = Z.copy()
+    AP = np.empty_like(X)
+    rz = np.vdot(R, Z)
+
+    for iteration in range(iterations_max + 1):
+        if np.vdot(R, R) <= seuil:
+            return iteration
+        if iteration == iterations_max:
+            break
+        produit_operateur(operateur, P, AP)
+        alpha = rz / np.vdot(P, AP)
+        X += alpha * P
+        R -= alpha * AP
+        np.divide(R, diagonale, out=Z)
+        rz, rz_precedent = np.vdot(R, Z), rz
+        P *= rz / rz_precedent
+        P += Z
+
+    raise ValueError(f"Le gradient conjugué n'a pas convergé en {iterations_max} itérations.")
+
 def trouver_encadrement(valeur, liste):
     """
     Trouve les indices des deux éléments de la liste triée qui encadrent la valeur donnée.
@@ -187,4 +633,200 @@ def moyenne_ponderee(index1, index2, y, x, valeur):
     poids2 = (valeur - x[index1]) / distance_total
 
     # on retourne la moyenne pondérée
-    return poids1 * y[index1] + poids2 * y[index2]
\ No newline at end of file
+    return poids1 * y[index1] + poids2 * y[index2]
+
+
+def preparer_sondes(points, positions):
+    """
+    Précalcule, une fois pour toutes, les indices et les poids de l'interpolation (linéaire en 1D,
+    bilinéaire en 2D) de plusieurs points dans une grille. Les points en dehors de la grille
+    sont ramenés au bord le plus proche.
+
+    Arguments :
+    points : array-like - Les coordonnées des points, de forme (nombre de points, dimension).
+    positions : list[array-like] - Pour chaque axe, les positions croissantes des points de la grille.
+
+    Retourne :
+    tuple (tuple[numpy.ndarray], numpy.ndarray) - Pour chaque axe, les indices des sommets qui entourent
+                                                  chaque point, et les poids correspondants, tous de forme
+                                                  (nombre de points, 2**dimension).
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, len(positions))
+    gauches, fractions = [], []
+    for axe, position in enumerate(positions):
+        position = np.asarray(position, dtype=float)
+        # sommet de gauche de l'intervalle contenant le point (le dernier intervalle pour le bord droit)
+        gauche = np.clip(np.searchsorted(position, points[:, axe], side='right') - 1, 0, len(position) - 2)
+        fraction = (points[:, axe] - position[gauche]) / (position[gauche + 1] - position[gauche])
+        gauches.append(gauche)
+        fractions.append(np.clip(fraction, 0, 1))
+
+    # les 2**dimension sommets de la cellule : 0 pour le sommet de gauche, 1 pour celui de droite sur chaque axe
+    sommets = np.array(list(itertools.product((0, 1), repeat=len(positions))))
+    indices = tuple(gauche[:, None] + sommets[:, axe] for axe, gauche in enumerate(gauches))
+    poids = np.ones((len(points), len(sommets)))
+    for axe, fraction in enumerate(fractions):
+        poids *= np.where(sommets[:, axe], fraction[:, None], 1 - fraction[:, None])
+    return indices, poids
+
+
+def interpoler_sondes(etats, sondes):
+    """
+    Interpole les températures en plusieurs points, pour un état ou pour tout un historique,
+    en une seule lecture vectorisée.
+
+    Arguments :
+    etats : numpy.ndarray - Un état (forme de la grille) ou un historique (instants, forme de la grille).
+    sondes : tuple - Les indices et les poids donnés par `preparer_sondes`.
+
+    Retourne :
+    numpy.ndarray - Les températures aux points, de forme (nombre de points,) pour un état
+                    ou (instants, nombre de points) pour un historique.
+    """
+    indices, poids = sondes
+    # températures aux sommets : (..., nombre de points, 2**dimension)
+    sommets = etats[(Ellipsis,) + indices]
+    return np.einsum('...ps,ps->...p', sommets, poids)
+
+
+def indices_sortie(Nt, pas_sortie):
+    """
+    Calcule les indices des pas de temps conservés : un tous les `pas_sortie` pas, et le dernier.
+
+    Arguments :
+    Nt : int - Nombre de pas de temps.
+    pas_sortie : int - Écart entre deux instantanés conservés.
+
+    Retourne :
+    numpy.ndarray - Les indices des pas de temps conservés.
+    """
+    indices = np.arange(0, Nt, pas_sortie)
+    if indices[-1] != Nt - 1:
+        indices = np.append(indices, Nt - 1)
+    return indices
+
+def dst1(x, axe=0):
+    """
+    Calcule la transformée en sinus discrète de type I selon un axe, en O(n log n) avec une FFT :
+    X_k = somme sur j de x_j sin(pi j k / (n + 1)), pour j, k de 1 à n.
+    Elle est son propre inverse au facteur 2 / (n + 1) près.
+
+    Arguments :
+    x : numpy.ndarray - Les valeurs à transformer.
+    axe : int - L'axe selon lequel on transforme.
+
+    Retourne :
+    numpy.ndarray - La transformée, de même forme que x.
+    """
+    x = np.moveaxis(np.asarray(x, dtype=float), axe, 0)
+    n = x.shape[0]
+    zero = np.zeros((1,) + x.shape[1:])
+    # prolongement impair de longueur 2(n + 1)
+    impair = np.concatenate([zero, x, zero, -x[::-1]], axis=0)
+    X = -np.fft.rfft(impair, axis=0).imag[1:n + 1] / 2
+    return np.moveaxis(X, 0, axe)
+
+def preparer_spectral(U0, D, dx):
+    """
+    Prépare la solution exacte en temps de l'équation de la chaleur discrétisée en espace
+    (différences finies sur une grille régulière, CL de Dirichlet constantes, D constant) :
+    la solution est la somme de l'état stationnaire et d'une série de sinus qui décroît exponentiellement.
+
+    Arguments :
+    U0 : numpy.ndarray - Les températures initiales (1D, 2D ou 3D), bords compris : les valeurs aux bords
+                         sont les conditions aux limites.
+    D : float - La diffusivité thermique.
+    dx : float ou list[float] - Le pas d'espace, ou un pas par axe.
+
+    Retourne :
+    tuple (numpy.ndarray, numpy.ndarray, numpy.ndarray) - L'état stationnaire, les coefficients
+                                                          de la série et les taux de décroissance.
+    """
+    U0 = np.asarray(U0, dtype=float)
+    interieur = (slice(1, -1),) * U0.ndim
+    pas = dx if np.ndim(dx) else (dx,) * U0.ndim
+
+    # valeurs propres du laplacien discret selon chaque axe
+    valeurs_propres = 0
+    contributions = np.zeros(U0[interieur].shape)
+    for axe, n in enumerate(contributions.shape):
+        forme = [1] * U0.ndim
+        forme[axe] = n
+        k = np.arange(1, n + 1)
+        valeurs_propres = valeurs_propres - 4 * np.sin(np.pi * k / (2 * (n + 1))).reshape(forme) ** 2 / pas[axe] ** 2
+        # les bords voisins de l'intérieur selon cet axe (premier et dernier plan de l'intérieur)
+        for bord in (0, -1):
+            face = interieur[:axe] + (bord,) + interieur[axe + 1:]
+            plan = (slice(None),) * axe + (bord,)
+            contributions[plan] += U0[face] / pas[axe] ** 2
+
+    # état stationnaire : laplacien discret nul à l'intérieur, résolu dans la base des sinus
+    transformee = contributions
+    for axe in range(U0.ndim):
+        transformee = dst1(transformee, axe)
+    transformee = -transformee / valeurs_propres
+    stationnaire = U0.copy()
+    stationnaire[interieur] = _dst1_inverse(transformee)
+
+    # coefficients de l'écart initial à l'état stationnaire
+    coefficients = U0[interieur] - stationnaire[interieur]
+    for axe in range(U0.ndim):
+        coefficients = dst1(coefficients, axe)
+
+    return stationnaire, coefficients, D * valeurs_propres
+
+def _dst1_inverse(X):
+    """
+    Calcule la transformée en sinus discrète inverse selon tous les axes de X.
+    """
+    for axe, n in enumerate(X.shape):
+        X = dst1(X, axe) * (2 / (n + 1))
+    return X
+
+def etat_spectral(preparation, t):
+    """
+    Évalue directement les températures à l'instant t, sans avancer dans le temps,
+    avec la préparation de `preparer_spectral`.
+
+    Arguments :
+    preparation : tuple - Résultat de `preparer_spectral`.
+    t : float - L'instant (depuis l'état initial).
+
+    Retourne :
+    numpy.ndarray - Les températures à l'instant t, bords compris.
+    """
+    stationnaire, coefficients, taux = preparation
+    U = stationnaire.copy()
+    U[(slice(1, -1),) * U.ndim] += _dst1_inverse(coefficients * np.exp(taux * t))
+    return U
+
+def limite_stabilite(dimension):
+    """
+    Renvoie la valeur maximale de r = D.dt/dx² pour laquelle le schéma d'Euler explicite est stable :
+    1/2 en 1D, 1/4 en 2D (1/(2d) en dimension d). Avec un coefficient par axe, c'est leur moyenne
+    qui doit rester sous cette limite.
+
+    Arguments :
+    dimension : str - La dimension ('1D', '2D' ou '3D').
+
+    Retourne :
+    float - La limite de stabilité.
+    """
+    return 1 / (2 * int(dimension[0]))
+
+def ecart(A, B, norme='max'):
+    """
+    Mesure l'écart entre deux champs de températures.
+
+    Arguments :
+    A, B : numpy.ndarray - Les deux champs, de même forme.
+    norme : str - 'max' pour l'écart maximal, 'L2' pour l'écart quadratique moyen.
+
+    Retourne :
+    float - L'écart entre A et B.
+    """
+    if norme == 'max':
+        return np.max(np.abs(A - B))
+    elif norme == 'L2':
+        return np.sqrt(np.mean((A - B) ** 2))
+    raise ValueError("`norme` doit être `max` ou `L2`.")